@@ -12,6 +12,7 @@ The application:
         * Chat interaction (`/` and `/get`)
         * Health checks (`/health`)
         * Prometheus monitoring metrics (`/metrics`)
+        * On-demand sampling profiles (`/admin/profile`, token-protected)
 """
 
 # =============================================================================
@@ -20,8 +21,13 @@ The application:
 
 from __future__ import annotations
 
+import hmac
+import os
+import uuid
+from contextlib import ExitStack
+
 # Flask and HTTP utilities
-from flask import Flask, request, Response, render_template, jsonify
+from flask import Flask, g, request, Response, render_template, jsonify, session
 
 # Prometheus client for metrics tracking
 from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
@@ -30,8 +36,18 @@ from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
 from dotenv import load_dotenv
 
 # Custom modules for ingestion and RAG pipeline building
+from flipkart.config import Config
 from flipkart.data_ingestion import DataIngestor
 from flipkart.rag_chain import RAGChainBuilder
+from flipkart.coalescing import CoalescedCallError, SingleFlight, normalize_query
+from flipkart.answer_index import AnswerIndex
+from flipkart.admission import REJECTED, AdmissionController, AdmissionRejected, TokenBucketLimiter
+
+# Structured logging with per-request correlation
+from utils.logger import LOG_QUERY_TEXT, get_logger, request_context, timed
+
+# Sampling profiler for the admin profiling endpoint
+from utils.profiling import ProfilerBusyError, SamplingProfiler
 
 
 # =============================================================================
@@ -41,6 +57,21 @@ from flipkart.rag_chain import RAGChainBuilder
 # Load environment variables (e.g., GROQ_API_KEY, HUGGINGFACEHUB_API_TOKEN, AstraDB credentials)
 load_dotenv()
 
+# Module logger (queue-based JSON records when LOG_ASYNC=true)
+logger = get_logger(__name__)
+
+# Signed cookie carrying the chat session ID between requests
+SESSION_COOKIE = "session_id"
+
+# Key signing session cookies; without it, a random per-process key is used
+SECRET_KEY = os.getenv("FLASK_SECRET_KEY")
+
+# Token required by admin endpoints (admin routes are disabled when unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Upper bound on the length of a single profiling session, in seconds
+MAX_PROFILE_SECONDS = 60
+
 
 # =============================================================================
 # Prometheus Metrics
@@ -52,6 +83,12 @@ REQUEST_COUNT = Counter("http_requests_total", "Total HTTP Requests")
 # Count RAG-specific POST requests (used for chatbot queries)
 RAG_REQUEST_COUNT = Counter("rag_requests_total", "Total RAG Requests")
 
+# Count RAG requests answered from the precomputed answer index
+ANSWER_INDEX_HIT_COUNT = Counter("rag_answer_index_hits_total", "RAG requests served from precomputed answers")
+
+# Count RAG requests answered by joining an identical in-flight chain run
+COALESCED_REQUEST_COUNT = Counter("rag_coalesced_requests_total", "RAG requests served by a shared in-flight run")
+
 
 # =============================================================================
 # Application Factory
@@ -69,6 +106,12 @@ def create_app() -> Flask:
     # Instantiate the Flask app
     app = Flask(__name__)
 
+    # Session IDs live in a signed cookie, so clients cannot mint their own
+    app.config.update(SESSION_COOKIE_NAME=SESSION_COOKIE, SESSION_COOKIE_SAMESITE="Lax")
+    app.secret_key = SECRET_KEY or os.urandom(32)
+    if not SECRET_KEY:
+        logger.warning("FLASK_SECRET_KEY is not set; chat sessions will not survive a restart")
+
     # -------------------------------------------------------------------------
     # Initialise the RAG pipeline components
     # -------------------------------------------------------------------------
@@ -77,7 +120,92 @@ def create_app() -> Flask:
     vector_store = DataIngestor().ingest(load_existing=True)
 
     # Build the RAG chain that will process user queries
-    rag_chain = RAGChainBuilder(vector_store).build_chain()
+    chain_builder = RAGChainBuilder(vector_store)
+    rag_chain = chain_builder.build_chain()
+
+    # Collapse identical concurrent first-turn questions into one chain run
+    single_flight = SingleFlight()
+
+    # Precomputed answers for frequent first-turn questions
+    answer_index = AnswerIndex()
+
+    # Bound the work any client can create: per-session and per-address rate
+    # limits and a global cap on concurrent chain executions with a short
+    # wait queue. The per-address bucket covers every session a client holds,
+    # so fetching `/` for a fresh session does not reset its limit.
+    rate_limiter = TokenBucketLimiter()
+    client_limiter = TokenBucketLimiter(
+        Config.CLIENT_RATE_LIMIT_PER_MINUTE, Config.CLIENT_RATE_LIMIT_BURST, reason="client_rate_limited"
+    )
+    admission = AdmissionController()
+
+    # Endpoints that issue sessions or run the chain, charged to the client address
+    CLIENT_LIMITED_ENDPOINTS = {"index", "get_response"}
+
+    # -------------------------------------------------------------------------
+    # Request Context: correlation IDs for every log record of a request
+    # -------------------------------------------------------------------------
+
+    def current_session_id() -> str:
+        """
+        Return the chat session of the current request.
+
+        Only IDs issued by this server (in the signed session cookie) are
+        trusted. Requests without one are anonymous and keyed by client address
+        (behind a NAT or a load balancer that hides client IPs, anonymous
+        clients sharing an address share one session).
+        """
+        session_id = session.get("sid")
+        if isinstance(session_id, str):
+            return session_id
+        return f"anonymous-{request.remote_addr}"
+
+    @app.before_request
+    def bind_request_context():
+        """Bind request and session IDs for the whole request, error handlers included."""
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.session_id = current_session_id()
+        g.context = ExitStack()
+        g.durations = g.context.enter_context(request_context(g.request_id, g.session_id))
+        # Coarse per-address limit across all of a client's sessions
+        if request.endpoint in CLIENT_LIMITED_ENDPOINTS:
+            client_limiter.check(request.remote_addr or "unknown")
+
+    @app.after_request
+    def echo_request_id(response: Response) -> Response:
+        """Echo the correlation ID on every response, including rejections."""
+        response.headers["X-Request-ID"] = g.request_id
+        return response
+
+    @app.teardown_request
+    def unbind_request_context(error: BaseException | None = None) -> None:
+        """Release the request context bound in `bind_request_context`."""
+        context = g.pop("context", None)
+        if context is not None:
+            context.close()
+
+    @app.errorhandler(AdmissionRejected)
+    def rejected(error: AdmissionRejected):
+        """Refuse an over-limit request fast, telling the client when to retry."""
+        # Counted here, once per response, so coalesced followers count too
+        REJECTED.labels(reason=error.reason).inc()
+        logger.warning(
+            "RAG request rejected: %s",
+            error.reason,
+            extra={"event": "rag_rejected", "reason": error.reason},
+        )
+        response = jsonify({"error": "Too many requests, please retry shortly", "reason": error.reason})
+        response.status_code = error.status
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response
+
+    @app.errorhandler(CoalescedCallError)
+    def shared_run_failed(error: CoalescedCallError):
+        """Give a coalesced request the same outcome as the run it joined."""
+        if isinstance(error.__cause__, AdmissionRejected):
+            return rejected(error.__cause__)
+        logger.error("Shared RAG chain run failed: %r", error.__cause__)
+        return jsonify({"error": "Internal server error"}), 500
 
     # -------------------------------------------------------------------------
     # Route: Root Page (Chat Interface)
@@ -96,7 +224,11 @@ def create_app() -> Flask:
         # Increment total request counter
         REQUEST_COUNT.inc()
         # Render HTML page from templates/
-        return render_template("index.html")
+        response = Response(render_template("index.html"))
+        # Issue a signed chat session ID so history and logs are tracked per user
+        if "sid" not in session:
+            session["sid"] = uuid.uuid4().hex
+        return response
 
     # -------------------------------------------------------------------------
     # Route: RAG Query Endpoint
@@ -109,9 +241,11 @@ def create_app() -> Flask:
 
         Returns
         -------
-        str | tuple
+        Response | tuple
             The chatbot’s generated answer if successful, or an error message
-            with status code 400 if the input message is empty.
+            with status code 400 if the input message is empty, 429 if the
+            session or client address is rate limited, or 503 if the server
+            is saturated.
         """
         # Increment request counters
         REQUEST_COUNT.inc()
@@ -122,14 +256,56 @@ def create_app() -> Flask:
         if not user_input:
             return jsonify({"error": "Empty message"}), 400
 
-        # Invoke the RAG chain with session context for message history tracking
-        result = rag_chain.invoke(
-            {"input": user_input},
-            config={"configurable": {"session_id": "user-session"}},
-        )
+        # Request and session IDs are bound by `bind_request_context`
+        session_id = g.session_id
+
+        # Reject sessions (or anonymous clients) sending faster than their token bucket allows
+        rate_limiter.check(session_id)
 
-        # Extract and return the model’s answer from the response dictionary
-        return result["answer"]
+        # Invoke the RAG chain with session context for message history tracking
+        def run_chain() -> str:
+            # Wait (briefly) for one of the global execution slots
+            with admission.slot(), timed("chain"):
+                result = rag_chain.invoke(
+                    {"input": user_input},
+                    config={"configurable": {"session_id": session_id}},
+                )
+            return result["answer"]
+
+        first_turn = not chain_builder.has_history(session_id)
+        answer = answer_index.get(user_input) if first_turn else None
+
+        if answer is not None:
+            # Head query: serve the precomputed answer without touching the chain
+            source = "answer_index"
+            ANSWER_INDEX_HIT_COUNT.inc()
+            chain_builder.record_turn(session_id, user_input, answer)
+        elif not first_turn:
+            # Follow-ups depend on per-session history and cannot be shared
+            answer, source = run_chain(), "chain"
+        else:
+            # First turns with the same normalised question share one run
+            answer, coalesced = single_flight.do(normalize_query(user_input), run_chain)
+            source = "coalesced" if coalesced else "chain"
+            if coalesced:
+                COALESCED_REQUEST_COUNT.inc()
+                chain_builder.record_turn(session_id, user_input, answer)
+
+        # Emit one structured summary record per request; the question
+        # text is only included when LOG_QUERY_TEXT=true
+        summary = {
+            "event": "rag_request",
+            "input_chars": len(user_input),
+            "first_turn": first_turn,
+            "source": source,
+            "durations_ms": g.durations,
+        }
+        if LOG_QUERY_TEXT:
+            summary["input"] = user_input
+        logger.info("RAG request served", extra=summary)
+
+        # Return the model’s answer (the correlation ID is echoed by `echo_request_id`)
+        return Response(answer)
 
     # -------------------------------------------------------------------------
     # Route: Prometheus Metrics Endpoint
@@ -152,6 +328,57 @@ def create_app() -> Flask:
         # Return formatted metrics output
         return Response(data, mimetype=CONTENT_TYPE_LATEST)
 
+    # -------------------------------------------------------------------------
+    # Route: Sampling Profiler Endpoint
+    # -------------------------------------------------------------------------
+
+    @app.route("/admin/profile", methods=["GET"])
+    def profile():
+        """
+        Capture a time-boxed sampling profile of the running server.
+
+        Query Parameters
+        ----------------
+        seconds : float, default=10
+            Sampling duration, capped at `MAX_PROFILE_SECONDS`.
+        interval : float, default=0.005
+            Seconds between samples.
+        format : {"speedscope", "collapsed"}, default="speedscope"
+            Output format.
+
+        Returns
+        -------
+        Response | tuple
+            The profile as a downloadable file, 404 if admin routes are
+            disabled, 403 on a bad token, or 409 if a session is running.
+        """
+        # Hide the route entirely unless an admin token is configured
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "Not found"}), 404
+        if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+            return jsonify({"error": "Forbidden"}), 403
+
+        seconds = min(request.args.get("seconds", 10.0, type=float), MAX_PROFILE_SECONDS)
+        interval = max(request.args.get("interval", 0.005, type=float), 0.001)
+        output = request.args.get("format", "speedscope")
+        if output not in ("speedscope", "collapsed"):
+            return jsonify({"error": "format must be 'speedscope' or 'collapsed'"}), 400
+
+        # Sample all threads while live traffic continues to be served
+        try:
+            result = SamplingProfiler(interval=interval).run(seconds)
+        except ProfilerBusyError as e:
+            return jsonify({"error": str(e)}), 409
+
+        if output == "collapsed":
+            body, mimetype, filename = result.to_collapsed(), "text/plain", "profile.collapsed.txt"
+        else:
+            body, mimetype, filename = result.to_speedscope(), "application/json", "profile.speedscope.json"
+
+        response = Response(body, mimetype=mimetype)
+        response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+        return response
+
     # -------------------------------------------------------------------------
     # Route: Health Check Endpoint
     # -------------------------------------------------------------------------
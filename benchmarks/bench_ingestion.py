@@ -0,0 +1,400 @@
+"""
+bench_ingestion.py
+
+Ingestion and embedding-throughput regression benchmark.
+
+Generates synthetic review corpora that follow the schema of
+`data/flipkart_product_review.csv`, then runs the real ingestion hot path —
+`DataConverter` snapshotting and batching, followed by `DataIngestor.ingest` —
+against a deterministic local fake embedder and an in-memory vector store.
+No network access or API keys are needed.
+
+For every (rows, batch size, workers) combination it reports:
+
+- rows/sec of the end-to-end ingest,
+- peak RSS of the process (each configuration runs in a fresh process),
+- per-stage wall-clock time: CSV parsing (cold snapshot build and warm
+  reload), document building, embedding and upserting. With several
+  workers, embedding and upserting overlap, so their wall-clock time is
+  the union of the intervals spent in each stage. The thread-summed
+  time is reported separately as `thread_seconds`.
+
+Results are written as JSON. Passing `--baseline` compares rows/sec and
+every stage time against a previous results file and exits non-zero on a
+regression beyond `--tolerance`, so the script can gate nightly loads in CI.
+A configuration whose process fails or dies (e.g. OOM-killed) also exits
+non-zero instead of waiting forever for its result.
+
+Usage
+-----
+From the project root:
+
+    python -m benchmarks.bench_ingestion --rows 10000 100000 --batch-sizes 256 1000 --workers 1 4
+    python -m benchmarks.bench_ingestion --rows 10000000 --store quantized --dim 64
+    python -m benchmarks.bench_ingestion --baseline artifacts/benchmarks/ingestion_baseline.json
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+# Rows written per chunk when generating synthetic corpora
+_WRITE_CHUNK = 50_000
+
+# Seconds between liveness checks while waiting for a configuration's result
+_POLL_SECONDS = 1.0
+
+# Stage slowdowns smaller than this (seconds) are timer noise, not regressions
+_MIN_STAGE_DELTA = 0.05
+
+# Vocabulary used to build synthetic review text
+_PRODUCTS = [
+    ("ACCFZGAQJGYCYDCM", "BoAt Rockerz 235v2 with ASAP charging Version 5.0 Bluetooth Headset"),
+    ("ACCFYGHXR7ZKE4KC", "realme Buds Wireless Bluetooth Headset"),
+    ("ACCFXH3ZKGRFZJMN", "boAt Airdopes 141 Bluetooth Headset"),
+    ("ACCG7F4UVQCFXHK3", "Noise Buds VS104 Bluetooth Headset"),
+    ("ACCFZDFHCZYHNHTB", "OnePlus Bullets Wireless Z2 Bluetooth Headset"),
+]
+_SUMMARIES = ["Terrific purchase", "Worth every penny", "Just okay", "Fair", "Could be better"]
+_WORDS = (
+    "sound bass battery backup charging fast comfortable fit gaming music calls "
+    "clarity noise cancellation price value quality build design connectivity "
+    "latency microphone volume durable lightweight wireless bluetooth range"
+).split()
+
+
+# --------------------------------------------------------------
+# Synthetic Corpus
+# --------------------------------------------------------------
+def generate_corpus(path: str, rows: int, seed: int = 0) -> None:
+    """
+    Write a synthetic CSV corpus following the Flipkart review schema.
+
+    Roughly one review in ten spans several lines, exercising the quoted
+    multi-line parsing path of real exports.
+
+    Parameters
+    ----------
+    path : str
+        Output CSV path.
+    rows : int
+        Number of review rows.
+    seed : int, default=0
+        Random seed for reproducibility.
+    """
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["product_id", "product_title", "rating", "summary", "review"])
+        for start in range(0, rows, _WRITE_CHUNK):
+            chunk = []
+            for _ in range(min(_WRITE_CHUNK, rows - start)):
+                product_id, title = rng.choice(_PRODUCTS)
+                words = rng.choices(_WORDS, k=rng.randint(8, 80))
+                if rng.random() < 0.1:
+                    words.insert(len(words) // 2, "\n")
+                chunk.append(
+                    (product_id, title, rng.randint(1, 5), rng.choice(_SUMMARIES), " ".join(words))
+                )
+            writer.writerows(chunk)
+
+
+# --------------------------------------------------------------
+# Fake Embedder
+# --------------------------------------------------------------
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic local embedder: each text is hashed to seed a random vector.
+
+    Also records the (start, end) interval of every embedding call so the
+    benchmark can separate embedding from upserting.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.intervals: list[tuple[float, float]] = []
+        self._local = threading.local()
+
+    def _embed(self, text: str) -> list[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+        return np.random.default_rng(seed).standard_normal(self.dim, dtype=np.float32).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        start = time.perf_counter()
+        vectors = [self._embed(t) for t in texts]
+        end = time.perf_counter()
+        self.intervals.append((start, end))
+        self._local.last_end = end
+        return vectors
+
+    def last_end(self) -> float:
+        """End time of the calling thread's most recent embedding call."""
+        return getattr(self._local, "last_end", 0.0)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+# --------------------------------------------------------------
+# Single Configuration Run (executed in a fresh process)
+# --------------------------------------------------------------
+def _wall_seconds(intervals: list[tuple[float, float]]) -> float:
+    """Length of the union of (start, end) intervals."""
+    total, reach = 0.0, float("-inf")
+    for start, end in sorted(intervals):
+        if end > reach:
+            total += end - max(start, reach)
+            reach = end
+    return total
+
+
+def _run_config(csv_path: str, workdir: str, batch_size: int, workers: int, dim: int, store: str) -> dict:
+    """Run one ingestion configuration and return its measurements."""
+    from langchain_core.vectorstores import InMemoryVectorStore
+
+    from flipkart.config import Config
+    from flipkart.data_converter import DataConverter
+    from flipkart.data_ingestion import DataIngestor
+    from flipkart.quantized_store import QuantizedVectorStore
+
+    # Keep snapshots, the local index and the answer index away from the real artifacts
+    Config.SNAPSHOT_DIR = os.path.join(workdir, "snapshots")
+    Config.LOCAL_INDEX_DIR = os.path.join(workdir, "vector_index")
+    Config.ANSWER_INDEX_PATH = os.path.join(workdir, "answer_index.json")
+    shutil.rmtree(Config.SNAPSHOT_DIR, ignore_errors=True)
+
+    converter = DataConverter(csv_path)
+    stages = {}
+
+    # Parsing: cold (CSV -> Arrow snapshot) and warm (memory-mapped reload)
+    start = time.perf_counter()
+    rows = converter.load_table().num_rows
+    stages["parse_cold"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter.load_table()
+    stages["parse_warm"] = time.perf_counter() - start
+
+    # Document building alone, from zero-copy snapshot slices
+    start = time.perf_counter()
+    for _ in converter.iter_batches(batch_size=batch_size):
+        pass
+    stages["build_documents"] = time.perf_counter() - start
+
+    # End-to-end ingest through DataIngestor with a fake embedder
+    embedding = HashEmbeddings(dim)
+    vstore = (
+        QuantizedVectorStore(embedding) if store == "quantized" else InMemoryVectorStore(embedding)
+    )
+    upsert_intervals: list[tuple[float, float]] = []
+    add_documents = vstore.add_documents
+
+    def timed_add(docs, **kwargs):
+        begin = time.perf_counter()
+        result = add_documents(docs, **kwargs)
+        # Upserting is the part of the call after this batch was embedded
+        upsert_intervals.append((max(begin, embedding.last_end()), time.perf_counter()))
+        return result
+
+    vstore.add_documents = timed_add
+    ingestor = DataIngestor(embedding=embedding, vstore=vstore)
+
+    start = time.perf_counter()
+    ingestor.ingest(load_existing=False, file_path=csv_path, batch_size=batch_size, workers=workers)
+    ingest_seconds = time.perf_counter() - start
+
+    stages["embed"] = _wall_seconds(embedding.intervals)
+    stages["upsert"] = _wall_seconds(upsert_intervals)
+    thread_seconds = {
+        "embed": sum(end - start for start, end in embedding.intervals),
+        "upsert": sum(end - start for start, end in upsert_intervals),
+    }
+
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "workers": workers,
+        "dim": dim,
+        "store": store,
+        "ingest_seconds": ingest_seconds,
+        "rows_per_sec": rows / ingest_seconds,
+        # ru_maxrss is reported in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "stage_seconds": stages,
+        "thread_seconds": thread_seconds,
+    }
+
+
+def _worker(results, *args) -> None:
+    """Subprocess entry point: run one configuration and report back."""
+    try:
+        results.put(_run_config(*args))
+    except BaseException:
+        results.put({"error": traceback.format_exc()})
+
+
+def _run_in_subprocess(context, args: tuple) -> dict:
+    """
+    Run one configuration in a fresh process and return its measurements.
+
+    Raises
+    ------
+    RuntimeError
+        If the configuration raised, or its process exited without a result.
+    """
+    results = context.Queue()
+    process = context.Process(target=_worker, args=(results, *args))
+    process.start()
+    try:
+        while True:
+            try:
+                result = results.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    # One last look in case the result landed as it exited
+                    try:
+                        result = results.get(timeout=_POLL_SECONDS)
+                        break
+                    except queue.Empty:
+                        raise RuntimeError(
+                            f"benchmark process exited with code {process.exitcode} without a result"
+                        ) from None
+        if "error" in result:
+            raise RuntimeError(f"benchmark process failed:\n{result['error']}")
+        return result
+    finally:
+        process.join(timeout=_POLL_SECONDS)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+
+# --------------------------------------------------------------
+# Regression Check
+# --------------------------------------------------------------
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Compare rows/sec and stage times with a baseline run.
+
+    A stage regresses when it is more than `1 + tolerance` times slower than
+    the baseline and at least `_MIN_STAGE_DELTA` seconds slower, so stages
+    such as `parse_cold` gate CI even when they are not part of rows/sec.
+
+    Returns
+    -------
+    list[str]
+        One message per configuration slower than `1 - tolerance` of baseline
+        rows/sec, and one per regressed stage.
+    """
+    key = lambda r: (r["rows"], r["batch_size"], r["workers"], r["dim"], r["store"])
+    reference = {key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        ref = reference.get(key(result))
+        if not ref:
+            continue
+        if result["rows_per_sec"] < (1 - tolerance) * ref["rows_per_sec"]:
+            regressions.append(
+                f"{key(result)}: {result['rows_per_sec']:.0f} rows/s vs baseline {ref['rows_per_sec']:.0f}"
+            )
+        for stage, seconds in result["stage_seconds"].items():
+            before = ref.get("stage_seconds", {}).get(stage)
+            if (
+                before is not None
+                and seconds > (1 + tolerance) * before
+                and seconds - before >= _MIN_STAGE_DELTA
+            ):
+                regressions.append(f"{key(result)}: {stage} took {seconds:.2f}s vs baseline {before:.2f}s")
+    return regressions
+
+
+def _positive_int(value: str) -> int:
+    """argparse type accepting integers >= 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def main() -> None:
+    """Parse arguments, run every configuration and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=_positive_int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-sizes", type=_positive_int, nargs="+", default=[1000])
+    parser.add_argument("--workers", type=_positive_int, nargs="+", default=[1])
+    parser.add_argument("--dim", type=int, default=768, help="Fake embedding dimension.")
+    parser.add_argument("--store", choices=["inmemory", "quantized"], default="inmemory")
+    parser.add_argument("--output", type=str, default=None, help="JSON output path.")
+    parser.add_argument("--baseline", type=str, default=None, help="Previous results to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed rows/sec drop and stage slowdown (fraction).")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(
+        "artifacts", "benchmarks", f"ingestion_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+    )
+    context = multiprocessing.get_context("spawn")
+    workdir = tempfile.mkdtemp(prefix="bench_ingestion_")
+    results = []
+
+    try:
+        for rows in args.rows:
+            csv_path = os.path.join(workdir, f"reviews_{rows}.csv")
+            generate_corpus(csv_path, rows)
+            for batch_size in args.batch_sizes:
+                for workers in args.workers:
+                    # Fresh process per configuration so peak RSS is not shared
+                    try:
+                        result = _run_in_subprocess(
+                            context, (csv_path, workdir, batch_size, workers, args.dim, args.store)
+                        )
+                    except RuntimeError as e:
+                        sys.exit(f"rows={rows} batch={batch_size} workers={workers}: {e}")
+                    results.append(result)
+                    print(
+                        f"rows={rows:>10,} batch={batch_size:>5} workers={workers:>2} "
+                        f"{result['rows_per_sec']:>10,.0f} rows/s  peak={result['peak_rss_mb']:,.0f} MB  "
+                        + " ".join(f"{k}={v:.2f}s" for k, v in result["stage_seconds"].items())
+                    )
+            os.remove(csv_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved results to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
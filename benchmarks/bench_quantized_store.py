@@ -0,0 +1,237 @@
+"""
+bench_quantized_store.py
+
+Benchmark for the local quantized vector index (`flipkart.quantized_store`).
+
+Builds exact (float32), int8 and product-quantized indexes over a synthetic,
+clustered set of 768-dimensional vectors (the bge-base embedding size) and
+reports, for each scheme:
+
+- memory footprint: the in-memory codes and codebooks plus the pages of the
+  memory-mapped full-precision vectors actually touched while re-scoring,
+- query throughput (queries per second),
+- recall@k against exact brute-force search.
+
+Quantized stores are saved and reloaded before searching, as the app does,
+so their full-precision vectors are memory-mapped rather than held in RAM.
+Touched pages are read from `/proc/self/smaps` (Linux only; elsewhere only
+the code size is reported).
+
+Usage
+-----
+From the project root:
+
+    python -m benchmarks.bench_quantized_store --rows 100000 --queries 200
+    python -m benchmarks.bench_quantized_store --output results/quantized.json
+    python -m benchmarks.bench_quantized_store --workdir artifacts
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from flipkart.quantized_store import QuantizedVectorStore, _normalise, _top_k
+
+
+# --------------------------------------------------------------
+# Synthetic Data
+# --------------------------------------------------------------
+def make_vectors(rows: int, queries: int, dim: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generate clustered, L2-normalised vectors resembling sentence embeddings.
+
+    Sentence embeddings have a much lower intrinsic dimension than their
+    ambient size, so vectors are drawn from clusters in a 64-d latent space,
+    projected to `dim` dimensions and perturbed with small isotropic noise.
+
+    Parameters
+    ----------
+    rows : int
+        Number of corpus vectors.
+    queries : int
+        Number of query vectors, drawn from the same distribution.
+    dim : int
+        Vector dimension.
+    seed : int, default=0
+        Random seed for reproducibility.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        Corpus of shape (rows, dim) and queries of shape (queries, dim),
+        both float32.
+    """
+    rng = np.random.default_rng(seed)
+    latent_dim = 64
+    projection = rng.standard_normal((latent_dim, dim)).astype(np.float32)
+    centres = rng.standard_normal((max(1, rows // 100), latent_dim)).astype(np.float32)
+
+    def sample(n: int) -> np.ndarray:
+        latent = centres[rng.integers(0, len(centres), size=n)]
+        latent = latent + 0.5 * rng.standard_normal((n, latent_dim)).astype(np.float32)
+        noise = 0.05 * rng.standard_normal((n, dim)).astype(np.float32)
+        return _normalise(latent @ projection / np.float32(np.sqrt(latent_dim)) + noise)
+
+    return sample(rows), sample(queries)
+
+
+# --------------------------------------------------------------
+# Memory Measurement
+# --------------------------------------------------------------
+def mapped_rss(path: str) -> int | None:
+    """
+    Resident bytes of this process's memory mappings of `path`.
+
+    Returns
+    -------
+    int | None
+        Bytes of the mapped file currently paged into the process, or None
+        when `/proc/self/smaps` is unavailable (non-Linux platforms).
+    """
+    try:
+        with open("/proc/self/smaps", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    total, in_mapping = 0, False
+    for line in lines:
+        fields = line.split()
+        if "-" in fields[0] and len(fields) >= 5:
+            # Mapping header: "start-end perms offset dev inode [path]"
+            in_mapping = len(fields) >= 6 and fields[5] == path
+        elif in_mapping and fields[0] == "Rss:":
+            total += int(fields[1]) * 1024
+    return total
+
+
+# --------------------------------------------------------------
+# Benchmark
+# --------------------------------------------------------------
+def run(
+    rows: int,
+    queries: int,
+    dim: int,
+    k: int,
+    rescore_factor: int,
+    pq_subvectors: int,
+    workdir: str | None = None,
+) -> dict:
+    """
+    Run the benchmark and return results as a JSON-serialisable dict.
+
+    Quantized stores are saved under a temporary directory inside `workdir`
+    (default: the system temp directory). How much of the mapped vector file
+    becomes resident depends on that filesystem and the kernel's page-cache
+    folio size, so point it at the filesystem that holds the real index.
+    """
+    vectors, query_vectors = make_vectors(rows, queries, dim)
+    texts = [str(i) for i in range(rows)]
+
+    # Exact brute-force ground truth
+    start = time.perf_counter()
+    truth = [set(_top_k(vectors @ q, k).tolist()) for q in query_vectors]
+    exact_s = time.perf_counter() - start
+
+    results = {
+        "rows": rows,
+        "dim": dim,
+        "k": k,
+        "queries": queries,
+        "exact": {
+            "memory_bytes": int(vectors.nbytes),
+            "qps": queries / exact_s,
+            "recall_at_k": 1.0,
+        },
+    }
+
+    workdir = tempfile.mkdtemp(prefix="bench_quantized_", dir=workdir)
+    try:
+        for scheme in ("int8", "pq"):
+            store = QuantizedVectorStore(
+                embedding=None,
+                quantization=scheme,
+                pq_subvectors=pq_subvectors,
+                rescore_factor=rescore_factor,
+            )
+            store.add_embeddings(texts, vectors, ids=texts)
+
+            # Build time covers quantizer training and encoding
+            start = time.perf_counter()
+            code_bytes = store.nbytes
+            build_s = time.perf_counter() - start
+
+            # Search a reloaded store, so full-precision vectors are memory-mapped
+            folder = os.path.join(workdir, scheme)
+            store.save(folder)
+            del store
+            store = QuantizedVectorStore.load(folder, embedding=None)
+
+            # Query throughput and recall of the rescored top-k
+            start = time.perf_counter()
+            hits = 0
+            for q, expected in zip(query_vectors, truth):
+                found = store.similarity_search_by_vector_with_score(q, k=k)
+                hits += len(expected & {int(doc.id) for doc, _ in found})
+            search_s = time.perf_counter() - start
+
+            # Vector pages paged in by re-scoring (file pages are mapped
+            # several at a time, so this exceeds the candidate rows alone)
+            touched = mapped_rss(os.path.realpath(os.path.join(folder, "vectors.npy")))
+            memory = code_bytes + (touched or 0)
+
+            results[scheme] = {
+                "memory_bytes": memory,
+                "code_bytes": code_bytes,
+                "mapped_vector_bytes": touched,
+                "compression": vectors.nbytes / memory,
+                "build_seconds": build_s,
+                "qps": queries / search_s,
+                "speedup_vs_exact": exact_s / search_s,
+                "recall_at_k": hits / (queries * k),
+            }
+            del store
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print or save the results."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=8)
+    parser.add_argument("--pq-subvectors", type=int, default=48)
+    parser.add_argument("--output", type=str, default=None, help="Optional JSON output path.")
+    parser.add_argument(
+        "--workdir", type=str, default=None, help="Directory (filesystem) where indexes are saved and mapped."
+    )
+    args = parser.parse_args()
+
+    results = run(
+        args.rows, args.queries, args.dim, args.k, args.rescore_factor, args.pq_subvectors, args.workdir
+    )
+    report = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+admission.py
+
+Admission control for expensive RAG chain executions.
+
+A single client can otherwise queue dozens of multi-second LLM chains and
+starve everyone else. This module bounds the work accepted by `/get` in two
+layers:
+
+- Token buckets limit how fast any one session, and any one client
+  address across all its sessions, may send requests; excess requests are
+  rejected immediately (HTTP 429).
+- A global concurrency limit caps simultaneous chain executions. Requests
+  beyond the limit wait in a bounded FIFO queue for at most a short
+  timeout; when the queue is full or the wait times out, the request is
+  rejected fast (HTTP 503) instead of piling up behind the backlog.
+
+Queue depth, in-flight executions, queue wait and rejections are exported
+to Prometheus.
+
+Classes
+-------
+AdmissionRejected
+    Raised when a request is refused; carries the HTTP status and Retry-After.
+TokenBucketLimiter
+    Per-key token-bucket rate limiter with a bounded number of tracked keys.
+AdmissionController
+    Global concurrency limit with a bounded, time-limited FIFO wait queue.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Deque, Iterator, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from flipkart.config import Config
+
+
+# Chain executions currently running
+IN_FLIGHT = Gauge("rag_admission_in_flight", "RAG chain executions currently running")
+
+# Requests waiting for a free execution slot
+QUEUE_DEPTH = Gauge("rag_admission_queue_depth", "RAG requests waiting for an execution slot")
+
+# Time spent waiting for a slot by admitted requests
+QUEUE_WAIT = Histogram(
+    "rag_admission_wait_seconds",
+    "Time admitted RAG requests waited for an execution slot",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# Requests refused by admission control, by reason (counted once per response)
+REJECTED = Counter(
+    "rag_admission_rejections_total",
+    "RAG requests rejected by admission control",
+    ["reason"],
+)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when admission control refuses a request.
+
+    Parameters
+    ----------
+    reason : str
+        One of "rate_limited", "client_rate_limited", "queue_full" or
+        "queue_timeout".
+    status : int
+        HTTP status to return (429 or 503).
+    retry_after : int
+        Seconds the client should wait before retrying.
+    """
+
+    def __init__(self, reason: str, status: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+# --------------------------------------------------------------
+# Per-Session Rate Limiting
+# --------------------------------------------------------------
+class TokenBucketLimiter:
+    """
+    Token-bucket rate limiter keyed by session ID or client address.
+
+    Each key owns a bucket of up to `burst` tokens refilled at
+    `rate_per_minute`; a request consumes one token. Buckets are kept in
+    least-recently-used order and the oldest are dropped beyond
+    `max_keys`, so memory stays bounded (an idle bucket is full anyway).
+
+    Parameters
+    ----------
+    rate_per_minute : float, default=Config.RATE_LIMIT_PER_MINUTE
+        Sustained requests per minute per key; 0 disables rate limiting.
+    burst : int, default=Config.RATE_LIMIT_BURST
+        Maximum number of requests a key may send back to back.
+    max_keys : int, default=100_000
+        Maximum number of buckets tracked at once.
+    reason : str, default="rate_limited"
+        Rejection reason reported in `AdmissionRejected` and metrics.
+
+    Methods
+    -------
+    check(key: str) -> None
+        Consume a token for `key` or raise `AdmissionRejected` (429).
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = Config.RATE_LIMIT_PER_MINUTE,
+        burst: int = Config.RATE_LIMIT_BURST,
+        max_keys: int = 100_000,
+        reason: str = "rate_limited",
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.burst = float(max(burst, 1))
+        self.max_keys = max_keys
+        self.reason = reason
+        self._lock = threading.Lock()
+        # key -> (tokens, last refill time)
+        self._buckets: OrderedDict[str, Tuple[float, float]] = OrderedDict()
+
+    def check(self, key: str) -> None:
+        """
+        Consume one token for `key`.
+
+        Parameters
+        ----------
+        key : str
+            Session ID or client address.
+
+        Raises
+        ------
+        AdmissionRejected
+            With status 429 and the seconds until a token is available.
+        """
+        if self.rate <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if not allowed:
+            raise AdmissionRejected(self.reason, 429, math.ceil((1.0 - tokens) / self.rate))
+
+
+# --------------------------------------------------------------
+# Global Concurrency Limit
+# --------------------------------------------------------------
+class AdmissionController:
+    """
+    Cap concurrent chain executions behind a bounded FIFO wait queue.
+
+    Slots are handed directly to the oldest waiter on release, so queued
+    requests are served in arrival order and a burst cannot overtake them.
+
+    Parameters
+    ----------
+    max_concurrency : int, default=Config.ADMISSION_MAX_CONCURRENCY
+        Maximum number of chain executions running at once.
+    max_queue : int, default=Config.ADMISSION_MAX_QUEUE
+        Maximum number of requests waiting for a slot.
+    queue_timeout : float, default=Config.ADMISSION_QUEUE_TIMEOUT
+        Seconds a request may wait before it is rejected.
+
+    Methods
+    -------
+    slot() -> ContextManager[None]
+        Hold an execution slot for the duration of the `with` block.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = Config.ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = Config.ADMISSION_MAX_QUEUE,
+        queue_timeout: float = Config.ADMISSION_QUEUE_TIMEOUT,
+    ):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: Deque[threading.Event] = deque()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Acquire an execution slot, waiting in the queue if necessary.
+
+        Raises
+        ------
+        AdmissionRejected
+            With status 503 if the queue is full or the wait timed out.
+        """
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _acquire(self) -> None:
+        """Take a free slot, or queue for one with a timeout."""
+        with self._lock:
+            if self._in_flight < self.max_concurrency and not self._waiters:
+                self._in_flight += 1
+                IN_FLIGHT.set(self._in_flight)
+                QUEUE_WAIT.observe(0.0)
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise AdmissionRejected("queue_full", 503, self._retry_after())
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            QUEUE_DEPTH.set(len(self._waiters))
+
+        start = time.perf_counter()
+        if not waiter.wait(self.queue_timeout):
+            with self._lock:
+                # The slot may have been handed over just as the wait expired
+                if not waiter.is_set():
+                    self._waiters.remove(waiter)
+                    QUEUE_DEPTH.set(len(self._waiters))
+                    raise AdmissionRejected("queue_timeout", 503, self._retry_after())
+        QUEUE_WAIT.observe(time.perf_counter() - start)
+
+    def _release(self) -> None:
+        """Hand the slot to the oldest waiter, or free it."""
+        with self._lock:
+            if self._waiters:
+                # The slot passes on directly; the in-flight count is unchanged
+                self._waiters.popleft().set()
+                QUEUE_DEPTH.set(len(self._waiters))
+            else:
+                self._in_flight -= 1
+                IN_FLIGHT.set(self._in_flight)
+
+    def _retry_after(self) -> int:
+        """Suggested client back-off, in whole seconds."""
+        return max(1, math.ceil(self.queue_timeout))
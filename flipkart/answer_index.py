@@ -0,0 +1,321 @@
+"""
+answer_index.py
+
+Precomputed answers for the most frequent first-turn product questions.
+
+Traffic has a fat head: many users ask the same few questions about the same
+few products. An offline job mines those questions from the structured
+request logs, answers them through the RAG chain in one batch, and stores
+the answers in a compact key-value index. `/get` serves these head queries
+from the index in microseconds and falls back to the live chain otherwise.
+
+Mining needs the JSON request logs written with ``LOG_ASYNC=true`` and
+``LOG_QUERY_TEXT=true``; the job fails if no mineable records are found.
+Ingesting new data deletes the index, so the job is a required step after
+every ingestion. ``--ingest`` does both in one go:
+
+    python -m flipkart.answer_index --ingest
+
+Classes
+-------
+AnswerIndex
+    In-memory question -> answer lookup backed by a JSON file.
+
+Functions
+---------
+mine_frequent_questions(log_paths, product_names, min_count, top_per_product) -> dict
+    Count normalised first-turn questions per product from JSON request logs.
+build_answer_index(rag_chain, questions, max_concurrency) -> AnswerIndex
+    Answer mined questions through the RAG chain in one batch.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from flipkart.coalescing import normalize_query
+from flipkart.config import Config
+from utils.logger import JSON_LOG_FILE, get_logger
+
+
+logger = get_logger(__name__)
+
+# Minimum interval between checks for a refreshed index file, in seconds
+_RELOAD_INTERVAL = 30.0
+
+
+class AnswerIndex:
+    """
+    Question -> answer lookup for precomputed head queries.
+
+    Keys are normalised questions (see `normalize_query`). The index is held
+    in a plain dict, so lookups are a single hash probe. The backing file is
+    loaded on the first lookup and re-read when the offline job replaces it.
+
+    Parameters
+    ----------
+    path : str, default=Config.ANSWER_INDEX_PATH
+        JSON file backing the index.
+
+    Methods
+    -------
+    get(question: str) -> str | None
+        Return the precomputed answer for a question, if any.
+    save() -> None
+        Atomically write the index to `path`.
+    invalidate(path: str) -> bool
+        Remove a stale index file; return whether one existed.
+    """
+
+    def __init__(self, path: str = Config.ANSWER_INDEX_PATH):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self._mtime = 0.0
+        self._next_check = 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, question: str) -> str | None:
+        """
+        Return the precomputed answer for `question`, or None on a miss.
+
+        Parameters
+        ----------
+        question : str
+            Raw user question.
+
+        Returns
+        -------
+        str | None
+            The stored answer, or None if the question is not in the index.
+        """
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + _RELOAD_INTERVAL
+            self._reload()
+
+        entry = self.entries.get(normalize_query(question))
+        return entry["answer"] if entry else None
+
+    def add(self, question: str, answer: str, product_name: str, count: int) -> None:
+        """Store an answer under the normalised question."""
+        self.entries[normalize_query(question)] = {
+            "answer": answer,
+            "product_name": product_name,
+            "count": count,
+        }
+
+    def save(self) -> None:
+        """Atomically write the index to its backing file."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def invalidate(path: str = Config.ANSWER_INDEX_PATH) -> bool:
+        """Delete the index file so stale answers are never served."""
+        if os.path.exists(path):
+            os.remove(path)
+            return True
+        return False
+
+    def _reload(self) -> None:
+        """Re-read the backing file if it changed (or disappeared)."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            self.entries, self._mtime = {}, 0.0
+            return
+        if mtime != self._mtime:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+            self._mtime = mtime
+            logger.info("Loaded %d precomputed answers from %s", len(self.entries), self.path)
+
+
+# --------------------------------------------------------------
+# Offline Mining
+# --------------------------------------------------------------
+def _tokens(text: str) -> set[str]:
+    """Lower-cased alphanumeric tokens of at least three characters."""
+    return {t for t in re.findall(r"[a-z0-9]+", text.casefold()) if len(t) >= 3}
+
+
+def _match_product(question: str, title_tokens: Dict[str, set[str]], idf: Dict[str, float]) -> str | None:
+    """
+    Return the product whose title shares the most distinctive tokens with the question.
+
+    Ties go to the first title in `title_tokens` order, so callers pass titles
+    in a fixed (sorted) order to keep matches reproducible across runs.
+    """
+    words = _tokens(question)
+    best, best_score = None, 0.0
+    for name, tokens in title_tokens.items():
+        # Sorted so float summation order (and thus ties) is reproducible
+        score = sum(idf[t] for t in sorted(words & tokens))
+        if score > best_score:
+            best, best_score = name, score
+    return best
+
+
+def mine_frequent_questions(
+    log_paths: Iterable[str],
+    product_names: Iterable[str],
+    min_count: int = 3,
+    top_per_product: int = 20,
+) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Find the most frequent first-turn questions per product in request logs.
+
+    Parameters
+    ----------
+    log_paths : Iterable[str]
+        JSON-lines log files written with `LOG_ASYNC=true` and
+        `LOG_QUERY_TEXT=true`.
+    product_names : Iterable[str]
+        Product titles from the review corpus.
+    min_count : int, default=3
+        Minimum number of occurrences for a question to be kept.
+    top_per_product : int, default=20
+        Maximum number of questions kept per product.
+
+    Returns
+    -------
+    Dict[str, List[Tuple[str, int]]]
+        Product name -> list of (normalised question, count), most frequent first.
+
+    Raises
+    ------
+    FileNotFoundError
+        If `log_paths` is empty.
+    ValueError
+        If the logs contain no first-turn request records with question text.
+    """
+    log_paths = list(log_paths)
+    if not log_paths:
+        raise FileNotFoundError(
+            "No JSON request logs found; run the server with LOG_ASYNC=true and LOG_QUERY_TEXT=true"
+        )
+
+    counts: Counter = Counter()
+    for path in log_paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                # Only first-turn questions are context-free and safe to reuse
+                if record.get("event") == "rag_request" and record.get("first_turn") and record.get("input"):
+                    counts[normalize_query(record["input"])] += 1
+
+    if not counts:
+        raise ValueError(
+            f"No first-turn questions with text in {len(log_paths)} log file(s); "
+            "question text is only logged with LOG_QUERY_TEXT=true"
+        )
+
+    # Weight title tokens by rarity so brand/model words decide the match;
+    # sorted titles make tie-breaks independent of hash order
+    title_tokens = {name: _tokens(name) for name in sorted(set(product_names))}
+    df = Counter(t for tokens in title_tokens.values() for t in tokens)
+    idf = {t: math.log(1 + len(title_tokens) / n) for t, n in df.items()}
+
+    per_product: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for question, count in counts.most_common():
+        if count < min_count:
+            break
+        product = _match_product(question, title_tokens, idf)
+        if product and len(per_product[product]) < top_per_product:
+            per_product[product].append((question, count))
+    return dict(per_product)
+
+
+def build_answer_index(
+    rag_chain,
+    questions: Dict[str, List[Tuple[str, int]]],
+    max_concurrency: int = 4,
+) -> AnswerIndex:
+    """
+    Answer mined questions through the RAG chain in one batch.
+
+    Parameters
+    ----------
+    rag_chain : RunnableWithMessageHistory
+        Chain built by `RAGChainBuilder.build_chain()`.
+    questions : Dict[str, List[Tuple[str, int]]]
+        Output of `mine_frequent_questions`.
+    max_concurrency : int, default=4
+        Maximum number of concurrent chain runs.
+
+    Returns
+    -------
+    AnswerIndex
+        A new index (not yet saved) holding every answer.
+    """
+    flat = [(q, product, count) for product, items in questions.items() for q, count in items]
+
+    # A fresh session per question keeps every run first-turn (no history)
+    results = rag_chain.batch(
+        [{"input": q} for q, _, _ in flat],
+        config=[
+            {"configurable": {"session_id": f"precompute-{i}"}, "max_concurrency": max_concurrency}
+            for i in range(len(flat))
+        ],
+    )
+
+    index = AnswerIndex()
+    for (question, product, count), result in zip(flat, results):
+        index.add(question, result["answer"], product, count)
+    return index
+
+
+# --------------------------------------------------------------
+# Command-Line Entry Point
+# --------------------------------------------------------------
+def main() -> None:
+    """Mine logs, answer head questions in batch and publish the index."""
+    from flipkart.data_converter import DataConverter
+    from flipkart.data_ingestion import DataIngestor
+    from flipkart.rag_chain import RAGChainBuilder
+
+    parser = argparse.ArgumentParser(description="Refresh the precomputed answer index.")
+    parser.add_argument("--ingest", action="store_true", help="Re-ingest the review corpus first.")
+    parser.add_argument("--logs", default=f"{JSON_LOG_FILE}*", help="Glob of JSON request logs.")
+    parser.add_argument("--min-count", type=int, default=3)
+    parser.add_argument("--top-per-product", type=int, default=20)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    vector_store = DataIngestor().ingest(load_existing=not args.ingest)
+
+    table = DataConverter("data/flipkart_product_review.csv").load_table()
+    products = table.column("product_title").unique().to_pylist()
+
+    questions = mine_frequent_questions(
+        sorted(glob.glob(args.logs)), products, args.min_count, args.top_per_product
+    )
+    logger.info("Mined %d head questions across %d products", sum(map(len, questions.values())), len(questions))
+
+    rag_chain = RAGChainBuilder(vector_store).build_chain()
+    index = build_answer_index(rag_chain, questions, args.max_concurrency)
+    index.save()
+    logger.info("Saved %d precomputed answers to %s", len(index), index.path)
+
+
+if __name__ == "__main__":
+    main()
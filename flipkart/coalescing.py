@@ -0,0 +1,154 @@
+"""
+coalescing.py
+
+Request coalescing ("single-flight") for identical concurrent queries.
+
+When many users send the same opening question at once, only the first
+request (the leader) runs the RAG chain; every concurrent duplicate (a
+follower) waits for and shares the leader's result. Keys are released as
+soon as the leader finishes, so results are never cached beyond the
+in-flight window. Followers wait for a bounded time only; if the leader
+hangs, they stop waiting and run the work themselves.
+
+Classes
+-------
+SingleFlight
+    Deduplicates concurrent calls that share a key.
+CoalescedCallError
+    Raised in followers when the leader's call failed.
+
+Functions
+---------
+normalize_query(text: str) -> str
+    Canonical form of a user question used as a coalescing key.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import re
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from flipkart.config import Config
+
+
+# --------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------
+def normalize_query(text: str) -> str:
+    """
+    Normalise a question so trivially different phrasings share one key.
+
+    Lower-cases the text, collapses whitespace and strips trailing
+    punctuation, e.g. ``"Best  earphones?"`` -> ``"best earphones"``.
+
+    Parameters
+    ----------
+    text : str
+        Raw user question.
+
+    Returns
+    -------
+    str
+        Normalised question.
+    """
+    return re.sub(r"\s+", " ", text.casefold()).strip().rstrip("?!. ")
+
+
+# --------------------------------------------------------------
+# Single-Flight
+# --------------------------------------------------------------
+class CoalescedCallError(RuntimeError):
+    """
+    Raised in a follower when the shared call failed in its leader.
+
+    Each follower gets its own instance, chained to the leader's exception
+    (available as ``__cause__``), so tracebacks are never shared between
+    threads.
+    """
+
+
+class _Call:
+    """State of one in-flight call shared by its leader and followers."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time; duplicates share its outcome.
+
+    Parameters
+    ----------
+    timeout : float, default=Config.COALESCE_WAIT_TIMEOUT
+        Seconds a follower waits for the leader before running `fn` itself.
+
+    Methods
+    -------
+    do(key: str, fn: Callable[[], Any]) -> tuple[Any, bool]
+        Execute `fn` or join the in-flight execution for `key`.
+    """
+
+    def __init__(self, timeout: float = Config.COALESCE_WAIT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Execute `fn` for `key`, or wait for an identical in-flight call.
+
+        Parameters
+        ----------
+        key : str
+            Coalescing key; calls with equal keys are deduplicated.
+        fn : Callable[[], Any]
+            Work to perform if no call for `key` is in flight.
+
+        Returns
+        -------
+        tuple[Any, bool]
+            The result and whether it was shared from another caller's run.
+            A follower whose leader did not finish within `timeout` runs
+            `fn` itself and returns ``(result, False)``.
+
+        Raises
+        ------
+        CoalescedCallError
+            In a follower, when the leader's call raised; chained from it.
+        BaseException
+            In the leader, whatever `fn` raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        # Followers wait (bounded) for the leader to publish its outcome
+        if not leader:
+            if not call.done.wait(self.timeout):
+                # The leader is stuck; do not hang with it
+                return fn(), False
+            if call.error is not None:
+                raise CoalescedCallError(f"Shared call for {key!r} failed") from call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Release the key before waking followers so new arrivals start fresh
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
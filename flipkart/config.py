@@ -19,6 +19,51 @@ EMBEDDING_MODEL : str
     Identifier for the sentence embedding model.
 RAG_MODEL : str
     Identifier for the retrieval-augmented generation (RAG) model.
+RETRIEVER_K : int
+    Number of documents passed to the LLM as context.
+RERANK_ENABLED : bool
+    Whether to re-rank an over-fetched candidate set with a cross-encoder.
+RERANK_MODEL : str
+    Identifier for the local cross-encoder used for re-ranking.
+RERANK_FETCH_K : int
+    Number of candidates fetched from the retriever before re-ranking.
+VECTOR_STORE : str
+    Vector store backend, either "astradb" or "local" (quantized index).
+LOCAL_INDEX_DIR : str
+    Directory where the local quantized index is persisted.
+QUANTIZATION : str
+    Quantization scheme for the local index, either "int8" or "pq".
+SNAPSHOT_DIR : str
+    Directory where columnar snapshots of the review corpus are cached.
+HISTORY_KEEP_MESSAGES : int
+    Minimum number of recent chat messages sent to the LLM verbatim.
+HISTORY_SUMMARY_CHUNK : int
+    Number of overflowing messages folded into the rolling summary at once.
+HISTORY_TOKEN_BUDGET : int
+    Maximum approximate tokens of chat history included in a prompt.
+ANSWER_INDEX_PATH : str
+    JSON file holding precomputed answers for frequent questions.
+SESSION_MAX_ENTRIES : int
+    Maximum number of chat sessions whose state is kept in memory.
+SESSION_TTL_SECONDS : float
+    Idle time after which a chat session's state is discarded.
+COALESCE_WAIT_TIMEOUT : float
+    Seconds a coalesced request waits for the shared run before running its own.
+ADMISSION_MAX_CONCURRENCY : int
+    Maximum number of RAG chain executions running at once.
+ADMISSION_MAX_QUEUE : int
+    Maximum number of requests waiting for a chain execution slot.
+ADMISSION_QUEUE_TIMEOUT : float
+    Seconds a queued request may wait before it is rejected with 503.
+RATE_LIMIT_PER_MINUTE : float
+    Sustained `/get` requests per minute per session (0 disables the limit).
+RATE_LIMIT_BURST : int
+    Requests a session may send back to back before being rate limited.
+CLIENT_RATE_LIMIT_PER_MINUTE : float
+    Sustained `/` and `/get` requests per minute per client address, across
+    all of its sessions (0 disables the limit).
+CLIENT_RATE_LIMIT_BURST : int
+    Requests a client address may send back to back before being rate limited.
 """
 
 # --------------------------------------------------------------
@@ -57,3 +102,64 @@ class Config:
 
     # RAG (Retrieval-Augmented Generation) model used for response generation
     RAG_MODEL = "llama-3.1-8b-instant"
+
+    # Number of retrieved documents sent to the LLM as context
+    RETRIEVER_K = int(os.getenv("RETRIEVER_K", "3"))
+
+    # Enable the cross-encoder re-ranking stage (off by default)
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+
+    # Small CPU-friendly cross-encoder used to score (query, review) pairs
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+    # Candidates over-fetched from the vector store when re-ranking is enabled
+    RERANK_FETCH_K = int(os.getenv("RERANK_FETCH_K", "30"))
+
+    # Vector store backend: "astradb" (managed) or "local" (quantized index)
+    VECTOR_STORE = os.getenv("VECTOR_STORE", "astradb")
+
+    # Directory holding the persisted local quantized index
+    LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", "artifacts/vector_index")
+
+    # Quantization scheme for the local index: "int8" or "pq"
+    QUANTIZATION = os.getenv("QUANTIZATION", "int8")
+
+    # Directory caching Arrow IPC snapshots of the parsed review corpus
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "artifacts/snapshots")
+
+    # Recent chat messages always sent verbatim (2 user/assistant turns)
+    HISTORY_KEEP_MESSAGES = int(os.getenv("HISTORY_KEEP_MESSAGES", "4"))
+
+    # Older messages are folded into the rolling summary in chunks of this size
+    HISTORY_SUMMARY_CHUNK = int(os.getenv("HISTORY_SUMMARY_CHUNK", "6"))
+
+    # Upper bound on approximate tokens of chat history per prompt
+    HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1000"))
+
+    # Precomputed answers for head queries (built by `python -m flipkart.answer_index`)
+    ANSWER_INDEX_PATH = os.getenv("ANSWER_INDEX_PATH", "artifacts/answer_index.json")
+
+    # Bounds on in-memory per-session state (histories, rolling summaries)
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+
+    # Longest time a coalesced request waits for the shared chain run, in seconds
+    COALESCE_WAIT_TIMEOUT = float(os.getenv("COALESCE_WAIT_TIMEOUT", "30"))
+
+    # Global cap on simultaneous RAG chain executions
+    ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+
+    # Requests allowed to wait for a free slot before new ones get 503
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+
+    # Longest time a queued request waits for a slot, in seconds
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5"))
+
+    # Per-session token bucket: sustained rate and burst size
+    RATE_LIMIT_PER_MINUTE = float(os.getenv("RATE_LIMIT_PER_MINUTE", "20"))
+    RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "5"))
+
+    # Per-address token bucket shared by all sessions of a client, so minting
+    # fresh sessions does not buy fresh per-session buckets
+    CLIENT_RATE_LIMIT_PER_MINUTE = float(os.getenv("CLIENT_RATE_LIMIT_PER_MINUTE", "60"))
+    CLIENT_RATE_LIMIT_BURST = int(os.getenv("CLIENT_RATE_LIMIT_BURST", "20"))
@@ -7,6 +7,13 @@ This module loads product review data from a CSV file and transforms each
 row into a LangChain `Document` containing the review text as content and
 the product title as metadata.
 
+Parsing large CSV exports (quoted, multi-line reviews) is slow, so the first
+load writes a columnar Arrow IPC snapshot of the cleaned corpus. Later loads
+memory-map that snapshot instead of re-parsing the CSV. Snapshots are keyed
+by the source file's absolute path and the SHA-256 of its contents, so any
+change to the CSV invalidates them and CSVs with the same name in different
+directories keep separate snapshots.
+
 Classes
 -------
 DataConverter
@@ -17,9 +24,22 @@ DataConverter
 # Imports
 # --------------------------------------------------------------
 from __future__ import annotations
+
+import hashlib
+import os
+import re
+from typing import Iterator
+
 import pandas as pd
+import pyarrow as pa
 from langchain_core.documents import Document
 
+from flipkart.config import Config
+
+
+# Columns kept in the snapshot, in storage order
+SNAPSHOT_COLUMNS = ["product_id", "product_title", "rating", "summary", "review"]
+
 
 class DataConverter:
     """
@@ -29,18 +49,96 @@ class DataConverter:
     ----------
     file_path : str
         Path to the CSV file containing product reviews.
+    snapshot_dir : str | None, default=None
+        Directory where Arrow IPC snapshots of the corpus are cached.
+        Defaults to `Config.SNAPSHOT_DIR`.
 
     Methods
     -------
+    load_table() -> pyarrow.Table
+        Return the cleaned corpus, memory-mapped from a snapshot.
+    iter_batches(batch_size: int = 1000) -> Iterator[list[Document]]
+        Yield Documents in batches built from zero-copy table slices.
     convert() -> list[Document]
         Reads the CSV and returns a list of LangChain Documents
         with review text as content and product title in metadata.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, snapshot_dir: str | None = None):
         # Store the path to the input CSV file
         self.file_path = file_path
 
+        # Store the directory holding columnar snapshots
+        self.snapshot_dir = snapshot_dir or Config.SNAPSHOT_DIR
+
+    def snapshot_path(self) -> str:
+        """
+        Return the snapshot path for the current contents of the source file.
+
+        Returns
+        -------
+        str
+            Path of the form
+            `<snapshot_dir>/<csv stem>.<path hash>.<sha256 prefix>.arrow`.
+        """
+        with open(self.file_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return os.path.join(self.snapshot_dir, f"{self._snapshot_prefix()}.{digest[:16]}.arrow")
+
+    def _snapshot_prefix(self) -> str:
+        """Return `<csv stem>.<path hash>`, shared by every snapshot of this file."""
+        source = os.path.abspath(self.file_path)
+        stem = os.path.splitext(os.path.basename(source))[0]
+        path_hash = hashlib.sha256(source.encode("utf-8")).hexdigest()[:8]
+        return f"{stem}.{path_hash}"
+
+    def load_table(self) -> pa.Table:
+        """
+        Load the cleaned review corpus as an Arrow table.
+
+        Builds the snapshot from CSV on first use (or after the CSV changes),
+        then memory-maps it so column buffers are read lazily and shared with
+        the OS page cache rather than copied onto the heap.
+
+        Returns
+        -------
+        pyarrow.Table
+            Table with the `SNAPSHOT_COLUMNS` columns.
+        """
+        path = self.snapshot_path()
+        if not os.path.exists(path):
+            self._write_snapshot(path)
+
+        # Zero-copy read: buffers reference the memory-mapped file directly
+        with pa.memory_map(path, "r") as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[list[Document]]:
+        """
+        Yield Documents in batches of at most `batch_size`.
+
+        Parameters
+        ----------
+        batch_size : int, default=1000
+            Maximum number of documents per batch.
+
+        Yields
+        ------
+        list[Document]
+            Documents built from one zero-copy slice of the snapshot.
+        """
+        table = self.load_table().select(["product_title", "review"])
+        for offset in range(0, table.num_rows, batch_size):
+            # Slicing shares buffers with the parent table; only the batch
+            # being converted is materialised as Python objects
+            batch = table.slice(offset, batch_size)
+            titles = batch.column("product_title").to_pylist()
+            reviews = batch.column("review").to_pylist()
+            yield [
+                Document(page_content=review, metadata={"product_name": title})
+                for title, review in zip(titles, reviews)
+            ]
+
     def convert(self) -> list[Document]:
         """
         Convert CSV rows into LangChain Document objects.
@@ -51,19 +149,41 @@ class DataConverter:
             A list of Document objects where each document contains
             the product review as text and the product title as metadata.
         """
+        # Gather every batch from the snapshot into a single list
+        return [doc for batch in self.iter_batches() for doc in batch]
+
+    def _write_snapshot(self, path: str) -> None:
+        """
+        Parse the CSV, clean it and write an Arrow IPC snapshot to `path`.
+
+        Older snapshots of the same source file (same absolute path) are removed.
+        """
         # Read required columns and drop rows missing critical data
-        df = pd.read_csv(self.file_path, usecols=["product_title", "review"]).dropna(
+        df = pd.read_csv(self.file_path, usecols=SNAPSHOT_COLUMNS).dropna(
             subset=["product_title", "review"]
         )
 
-        # Convert each row into a LangChain Document
-        docs = [
-            Document(
-                page_content=str(row["review"]).strip(),
-                metadata={"product_name": str(row["product_title"]).strip()},
-            )
-            for _, row in df.iterrows()
-        ]
-
-        # Return the list of prepared Document objects
-        return docs
+        # Normalise text columns once, so every later load is ready to use
+        for column in ("product_id", "product_title", "summary", "review"):
+            df[column] = df[column].fillna("").astype(str).str.strip()
+
+        table = pa.Table.from_pandas(df[SNAPSHOT_COLUMNS], preserve_index=False)
+
+        # Write atomically so concurrent readers never see a partial file
+        os.makedirs(self.snapshot_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        # Drop snapshots built from previous versions of this exact file;
+        # snapshots of other CSVs never match the path-hashed prefix
+        pattern = re.compile(re.escape(self._snapshot_prefix()) + r"\.[0-9a-f]{16}\.arrow")
+        for name in os.listdir(self.snapshot_dir):
+            stale = os.path.join(self.snapshot_dir, name)
+            if pattern.fullmatch(name) and stale != path:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass  # Removed concurrently by another loader
@@ -1,17 +1,18 @@
 """
 data_ingestion.py
 
-Module for building and managing the AstraDB vector store used in the
+Module for building and managing the vector store used in the
 Flipkart Product Recommender project.
 
-This module connects to AstraDB, initialises a Hugging Face embedding model,
-and optionally ingests product review documents from CSV into the vector store.
+This module initialises a Hugging Face embedding model, connects to either
+AstraDB or a local quantized index, and optionally ingests product review
+documents from CSV into the vector store.
 
 Classes
 -------
 DataIngestor
     Handles embedding model setup, vector store connection,
-    and ingestion of review documents into AstraDB.
+    and ingestion of review documents into the selected backend.
 """
 
 # --------------------------------------------------------------
@@ -19,67 +20,138 @@ DataIngestor
 # --------------------------------------------------------------
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from langchain_astradb import AstraDBVectorStore
 from langchain_huggingface import HuggingFaceEndpointEmbeddings
+from flipkart.answer_index import AnswerIndex
 from flipkart.data_converter import DataConverter
+from flipkart.quantized_store import QuantizedVectorStore
 from flipkart.config import Config
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Documents converted and uploaded per vector store call during ingestion
+INGEST_BATCH_SIZE = 1000
+
+# Default review corpus ingested into the vector store
+DATA_FILE = "data/flipkart_product_review.csv"
 
 
 class DataIngestor:
     """
     Initialise embeddings and vector store; optionally ingest documents.
 
+    Parameters
+    ----------
+    backend : str, default=Config.VECTOR_STORE
+        Either "astradb" for the managed AstraDB collection or "local" for an
+        int8 / product-quantized index persisted in `Config.LOCAL_INDEX_DIR`.
+    embedding : Embeddings | None, default=None
+        Embedding model to use instead of the Hugging Face endpoint.
+    vstore : VectorStore | None, default=None
+        Vector store to use instead of the configured backend.
+
     Attributes
     ----------
     embedding : HuggingFaceEndpointEmbeddings
         Embedding model initialised via Hugging Face Inference API.
-    vstore : AstraDBVectorStore
-        Vector store connected to AstraDB for storing embedded documents.
+    vstore : AstraDBVectorStore | QuantizedVectorStore
+        Vector store used for storing embedded documents.
 
     Methods
     -------
-    ingest(load_existing: bool = True) -> AstraDBVectorStore
+    ingest(load_existing: bool = True, ...) -> AstraDBVectorStore | QuantizedVectorStore
         Return an existing vector store or ingest documents from CSV before returning it.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = Config.VECTOR_STORE, embedding=None, vstore=None):
+        self.backend = backend
+
         # Initialise the Hugging Face embedding model using Config parameters
-        self.embedding = HuggingFaceEndpointEmbeddings(model=Config.EMBEDDING_MODEL)
-
-        # Create the AstraDB vector store connection
-        self.vstore = AstraDBVectorStore(
-            embedding=self.embedding,
-            collection_name="flipkart_database",
-            api_endpoint=Config.ASTRA_DB_API_ENDPOINT,
-            token=Config.ASTRA_DB_APPLICATION_TOKEN,
-            namespace=Config.ASTRA_DB_KEYSPACE,
-        )
-
-    def ingest(self, load_existing: bool = True) -> AstraDBVectorStore:
+        self.embedding = embedding or HuggingFaceEndpointEmbeddings(model=Config.EMBEDDING_MODEL)
+
+        if vstore is not None:
+            # Use the injected store (e.g. an in-memory store for benchmarks)
+            self.vstore = vstore
+        elif backend == "local":
+            # Load the persisted quantized index, or start an empty one
+            if QuantizedVectorStore.exists(Config.LOCAL_INDEX_DIR):
+                self.vstore = QuantizedVectorStore.load(Config.LOCAL_INDEX_DIR, self.embedding)
+            else:
+                self.vstore = QuantizedVectorStore(self.embedding, quantization=Config.QUANTIZATION)
+        elif backend == "astradb":
+            # Create the AstraDB vector store connection
+            self.vstore = AstraDBVectorStore(
+                embedding=self.embedding,
+                collection_name="flipkart_database",
+                api_endpoint=Config.ASTRA_DB_API_ENDPOINT,
+                token=Config.ASTRA_DB_APPLICATION_TOKEN,
+                namespace=Config.ASTRA_DB_KEYSPACE,
+            )
+        else:
+            raise ValueError(f"Unknown vector store backend: {backend!r}")
+
+    def ingest(
+        self,
+        load_existing: bool = True,
+        file_path: str = DATA_FILE,
+        batch_size: int = INGEST_BATCH_SIZE,
+        workers: int = 1,
+    ) -> AstraDBVectorStore | QuantizedVectorStore:
         """
-        Create or load an AstraDB vector store containing review documents.
+        Create or load a vector store containing review documents.
 
         Parameters
         ----------
         load_existing : bool, default=True
             If True, returns the existing store without re-ingestion.
             If False, loads review data from CSV and adds it to the store.
+        file_path : str, default=DATA_FILE
+            CSV file containing the review corpus.
+        batch_size : int, default=INGEST_BATCH_SIZE
+            Documents embedded and upserted per vector store call.
+        workers : int, default=1
+            Number of batches embedded and upserted concurrently.
 
         Returns
         -------
-        AstraDBVectorStore
-            The AstraDB vector store instance containing embedded documents.
+        AstraDBVectorStore | QuantizedVectorStore
+            The vector store instance containing embedded documents.
         """
         # Return the existing store without adding new documents
         if load_existing:
             return self.vstore
 
-        # Convert CSV data into LangChain Document objects
-        docs = DataConverter("data/flipkart_product_review.csv").convert()
-
-        # Add documents to the vector store if any exist
-        if docs:
-            self.vstore.add_documents(docs)
-
-        # Return the prepared AstraDB vector store
+        # Stream Documents from the columnar snapshot in fixed-size batches
+        batches = DataConverter(file_path).iter_batches(batch_size=batch_size)
+        if workers <= 1:
+            for docs in batches:
+                # Add each batch to the vector store
+                self.vstore.add_documents(docs)
+        else:
+            # Keep at most 2 batches per worker in flight to bound memory
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for docs in batches:
+                    if len(pending) >= 2 * workers:
+                        pending.popleft().result()
+                    pending.append(pool.submit(self.vstore.add_documents, docs))
+                for future in pending:
+                    future.result()
+
+        # Answers precomputed against the previous corpus are now stale
+        if AnswerIndex.invalidate(Config.ANSWER_INDEX_PATH):
+            logger.warning(
+                "Deleted the stale answer index; rebuild it with `python -m flipkart.answer_index`"
+            )
+
+        # Persist the quantized local index so later runs can load it
+        if self.backend == "local" and isinstance(self.vstore, QuantizedVectorStore):
+            self.vstore.save(Config.LOCAL_INDEX_DIR)
+
+        # Return the prepared vector store
         return self.vstore
@@ -0,0 +1,238 @@
+"""
+prompts.py
+
+Prompt assembly layer for the Flipkart Product Recommender RAG chain.
+
+This module keeps LLM input tokens per request low by:
+- Using fully static system prompts, so every request shares an identical,
+  provider-cacheable prefix.
+- Sending the user question exactly once, together with the retrieved
+  context, in the final human message.
+- Folding older conversation turns into a rolling summary, so only the most
+  recent turns are sent verbatim.
+- Counting prompt tokens locally before each LLM call, trimming history to
+  a fixed budget and exporting the counts to Prometheus.
+
+Classes
+-------
+HistoryCompressor
+    Maintains a per-session rolling summary and returns compacted history.
+
+Functions
+---------
+build_rephrase_prompt() -> ChatPromptTemplate
+    Prompt that rewrites a follow-up question as a standalone one.
+build_qa_prompt() -> ChatPromptTemplate
+    Prompt that answers a question from retrieved review context.
+count_prompt_tokens(prompt: PromptValue, stage: str) -> PromptValue
+    Record the approximate token count of a prompt and pass it through.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+from typing import List
+
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, get_buffer_string, trim_messages
+from langchain_core.prompt_values import PromptValue
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from prometheus_client import Histogram
+
+from flipkart.config import Config
+from flipkart.session_cache import SessionCache
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# Approximate input tokens sent to the LLM, per chain stage
+PROMPT_TOKENS = Histogram(
+    "rag_prompt_tokens",
+    "Approximate input tokens per LLM call",
+    ["stage"],
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+
+
+# --------------------------------------------------------------
+# Static System Prompts (identical across requests => cacheable prefix)
+# --------------------------------------------------------------
+REPHRASE_SYSTEM_PROMPT = (
+    "Given the chat history and user question, "
+    "rewrite it as a standalone question."
+)
+
+QA_SYSTEM_PROMPT = (
+    "You're an e-commerce assistant answering product-related queries "
+    "using reviews and titles. Stick to the provided context. "
+    "Be concise and helpful."
+)
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            (
+                "Condense the conversation below into a brief summary that keeps "
+                "the products, preferences and constraints the user mentioned. "
+                "Extend the existing summary if one is given. Reply with the summary only."
+            ),
+        ),
+        ("human", "EXISTING SUMMARY:\n{summary}\n\nNEW LINES:\n{lines}"),
+    ]
+)
+
+
+# --------------------------------------------------------------
+# Prompt Builders
+# --------------------------------------------------------------
+def build_rephrase_prompt() -> ChatPromptTemplate:
+    """
+    Build the prompt that rewrites a follow-up question as a standalone one.
+
+    Returns
+    -------
+    ChatPromptTemplate
+        Static system prefix, compacted history and the user question.
+    """
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", REPHRASE_SYSTEM_PROMPT),
+            MessagesPlaceholder(variable_name="chat_history"),
+            ("human", "{input}"),
+        ]
+    )
+
+
+def build_qa_prompt() -> ChatPromptTemplate:
+    """
+    Build the question-answering prompt.
+
+    The system message carries no variables, so it forms a stable prefix
+    across requests; context and question appear once, in the last message.
+
+    Returns
+    -------
+    ChatPromptTemplate
+        Static system prefix, compacted history and a context+question turn.
+    """
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", QA_SYSTEM_PROMPT),
+            MessagesPlaceholder(variable_name="chat_history"),
+            ("human", "CONTEXT:\n{context}\n\nQUESTION: {input}"),
+        ]
+    )
+
+
+def count_prompt_tokens(prompt: PromptValue, stage: str) -> PromptValue:
+    """
+    Count a prompt's tokens locally, record them and return the prompt unchanged.
+
+    Parameters
+    ----------
+    prompt : PromptValue
+        The formatted prompt about to be sent to the LLM.
+    stage : str
+        Chain stage label (e.g. "rephrase", "qa").
+
+    Returns
+    -------
+    PromptValue
+        The same prompt, for use inside an LCEL pipe.
+    """
+    tokens = count_tokens_approximately(prompt.to_messages())
+    PROMPT_TOKENS.labels(stage=stage).observe(tokens)
+    logger.info("Prompt tokens (%s): %d", stage, tokens, extra={"prompt_tokens": {stage: tokens}})
+    return prompt
+
+
+# --------------------------------------------------------------
+# Rolling History Compression
+# --------------------------------------------------------------
+class HistoryCompressor:
+    """
+    Compact chat history into a rolling summary plus recent verbatim turns.
+
+    Older messages are summarised in chunks rather than on every turn, so the
+    extra summarisation call happens only once per `summary_chunk` messages.
+
+    Parameters
+    ----------
+    model : BaseChatModel
+        Chat model used to write summaries.
+    keep_messages : int, default=Config.HISTORY_KEEP_MESSAGES
+        Minimum number of most recent messages sent verbatim.
+    summary_chunk : int, default=Config.HISTORY_SUMMARY_CHUNK
+        Number of overflowing messages that triggers a summary update.
+    token_budget : int, default=Config.HISTORY_TOKEN_BUDGET
+        Maximum approximate tokens of compacted history sent to the LLM.
+
+    Attributes
+    ----------
+    summaries : SessionCache
+        Per-session summary text and number of messages it covers; idle and
+        least recently used sessions are evicted.
+    """
+
+    def __init__(
+        self,
+        model,
+        keep_messages: int = Config.HISTORY_KEEP_MESSAGES,
+        summary_chunk: int = Config.HISTORY_SUMMARY_CHUNK,
+        token_budget: int = Config.HISTORY_TOKEN_BUDGET,
+    ):
+        self.summary_chain = SUMMARY_PROMPT | model
+        self.keep_messages = keep_messages
+        self.summary_chunk = summary_chunk
+        self.token_budget = token_budget
+        self.summaries = SessionCache()
+
+    def compact(self, messages: List[BaseMessage], session_id: str) -> List[BaseMessage]:
+        """
+        Return the history to send to the LLM for a session.
+
+        Parameters
+        ----------
+        messages : List[BaseMessage]
+            Full stored history of the session.
+        session_id : str
+            Session whose rolling summary is used and updated.
+
+        Returns
+        -------
+        List[BaseMessage]
+            An optional summary message followed by recent messages, trimmed
+            to the token budget.
+        """
+        summary, covered = self.summaries.get(session_id, ("", 0))
+
+        # The session's history was evicted and restarted: the summary is stale
+        if covered > len(messages):
+            summary, covered = "", 0
+            self.summaries.pop(session_id, None)
+
+        # Fold overflowing messages into the summary once a full chunk has built up
+        if len(messages) - covered > self.keep_messages + self.summary_chunk:
+            boundary = len(messages) - self.keep_messages
+            lines = get_buffer_string(messages[covered:boundary])
+            summary = self.summary_chain.invoke({"summary": summary or "(none)", "lines": lines}).content
+            covered = boundary
+            self.summaries[session_id] = (summary, covered)
+
+        compacted: List[BaseMessage] = list(messages[covered:])
+        if summary:
+            compacted.insert(0, SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+
+        # Safety net: never let history exceed the token budget
+        return trim_messages(
+            compacted,
+            max_tokens=self.token_budget,
+            token_counter=count_tokens_approximately,
+            strategy="last",
+            include_system=True,
+            start_on="human",
+        )
@@ -0,0 +1,470 @@
+"""
+quantized_store.py
+
+Local, memory-compact vector store for the Flipkart Product Recommender.
+
+Embeddings are kept as compact quantized codes in one contiguous array and
+searched with approximate inner-product scores. The best candidates are then
+re-scored exactly against the full-precision vectors. Until the store is
+saved these vectors stay on the heap; a loaded store memory-maps them, so
+re-scoring pages them in as clean, evictable page cache instead.
+
+Two quantization schemes are supported:
+
+- ``"int8"`` — per-dimension scalar quantization (4x smaller than float32).
+- ``"pq"``   — product quantization with 256 centroids per sub-vector
+  (one byte per sub-vector, e.g. 48 bytes for a 768-d vector). Codes are
+  stored sub-vector-major so each lookup-table gather is a contiguous scan.
+
+Classes
+-------
+QuantizedVectorStore
+    LangChain-compatible vector store backed by quantized codes.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from typing import Any, Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+
+# Rows decoded per block during int8 search; small enough for the scratch
+# buffer to stay cache-resident between the decode and the dot product
+_DECODE_BLOCK = 256
+
+# Rows processed per block when assigning vectors to centroids
+_ASSIGN_BLOCK = 65_536
+
+# Number of k-means iterations used to train product-quantization codebooks
+_KMEANS_ITERS = 20
+
+# Maximum number of vectors sampled to train product-quantization codebooks
+_KMEANS_SAMPLE = 16_384
+
+
+class QuantizedVectorStore(VectorStore):
+    """
+    Vector store holding int8 or product-quantized embeddings.
+
+    Parameters
+    ----------
+    embedding : Embeddings
+        Embedding model used for documents and queries.
+    quantization : {"int8", "pq"}, default="int8"
+        Quantization scheme applied to stored vectors.
+    pq_subvectors : int, default=48
+        Number of sub-vectors per embedding when ``quantization="pq"``.
+        Must divide the embedding dimension.
+    rescore_factor : int, default=8
+        Number of approximate candidates re-scored exactly, as a multiple of k.
+
+    Methods
+    -------
+    add_embeddings(texts, embeddings, metadatas=None, ids=None) -> list[str]
+        Store pre-computed embeddings alongside their texts.
+    similarity_search_with_score(query, k=4) -> list[tuple[Document, float]]
+        Approximate search over quantized codes with exact re-scoring.
+    save(folder: str) -> None
+        Persist codes, vectors and documents to a directory.
+    load(folder: str, embedding: Embeddings) -> QuantizedVectorStore
+        Load a saved store, memory-mapping the full-precision vectors.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        quantization: str = "int8",
+        pq_subvectors: int = 48,
+        rescore_factor: int = 8,
+    ):
+        if quantization not in ("int8", "pq"):
+            raise ValueError(f"Unsupported quantization: {quantization!r}")
+
+        self.embedding = embedding
+        self.quantization = quantization
+        self.pq_subvectors = pq_subvectors
+        self.rescore_factor = rescore_factor
+
+        # Stored documents, ids and full-precision (normalised) vectors
+        self._docs: list[Document] = []
+        self._ids: list[str] = []
+        self._vectors: np.ndarray | None = None
+
+        # Batches added since the last build, concatenated once on demand
+        self._pending: list[np.ndarray] = []
+
+        # Quantized codes and quantizer parameters (built lazily)
+        self._codes: np.ndarray | None = None
+        self._params: dict[str, np.ndarray] = {}
+        self._dirty = False
+
+        # Directory whose files match the current contents (set by load/save)
+        self._saved_to: str | None = None
+
+        # Serialises appends when batches are ingested from several threads
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------
+    # VectorStore interface
+    # ----------------------------------------------------------
+    @property
+    def embeddings(self) -> Embeddings:
+        """Return the embedding model used by the store."""
+        return self.embedding
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """
+        Embed texts and add them to the store.
+
+        Returns
+        -------
+        list[str]
+            Identifiers of the added documents.
+        """
+        texts = list(texts)
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        texts: list[str],
+        embeddings: list[list[float]] | np.ndarray,
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> list[str]:
+        """
+        Add texts with pre-computed embeddings to the store.
+
+        Quantization is deferred until the next search or save, so repeated
+        batch inserts during ingestion only train the quantizer once.
+
+        Returns
+        -------
+        list[str]
+            Identifiers of the added documents.
+        """
+        vectors = _normalise(np.asarray(embeddings, dtype=np.float32))
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+
+        with self._lock:
+            # Buffer the batch; it joins the contiguous array on the next build
+            self._pending.append(vectors)
+            self._docs.extend(
+                Document(page_content=t, metadata=dict(m), id=i)
+                for t, m, i in zip(texts, metadatas, ids)
+            )
+            self._ids.extend(ids)
+            self._dirty = True
+            self._saved_to = None
+        return ids
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        """Return the k documents most similar to the query."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        """Return the k most similar documents with their cosine scores."""
+        vector = self.embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(vector, k=k)
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        """Return the k documents most similar to an embedding vector."""
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k=k)]
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float] | np.ndarray, k: int = 4
+    ) -> list[tuple[Document, float]]:
+        """
+        Search the quantized codes, then re-score the top candidates exactly.
+
+        Parameters
+        ----------
+        embedding : list[float] | np.ndarray
+            Query embedding.
+        k : int, default=4
+            Number of results to return.
+
+        Returns
+        -------
+        list[tuple[Document, float]]
+            Copies of the matching documents and their exact cosine
+            similarity scores, best first.
+        """
+        if not self._docs:
+            return []
+        self._ensure_codes()
+
+        query = _normalise(np.asarray(embedding, dtype=np.float32)[None, :])[0]
+
+        # Approximate scores over quantized codes -> shortlist of candidates
+        approx = self._approximate_scores(query)
+        n_candidates = min(len(approx), max(k, k * self.rescore_factor))
+        # Sorted row order keeps memory-mapped reads sequential
+        candidates = np.sort(_top_k(approx, n_candidates))
+
+        # Exact re-score of the shortlist against full-precision vectors
+        exact = np.asarray(self._vectors[candidates]) @ query
+        order = np.argsort(-exact)[:k]
+
+        # Return copies so callers cannot modify the stored documents
+        results = []
+        for o in order:
+            doc = self._docs[candidates[o]]
+            copy = Document(page_content=doc.page_content, metadata=dict(doc.metadata), id=doc.id)
+            results.append((copy, float(exact[o])))
+        return results
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: list[dict] | None = None,
+        *,
+        ids: list[str] | None = None,
+        **kwargs: Any,
+    ) -> QuantizedVectorStore:
+        """Create a store from raw texts."""
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    # ----------------------------------------------------------
+    # Persistence
+    # ----------------------------------------------------------
+    def save(self, folder: str) -> None:
+        """
+        Persist the store to ``folder``.
+
+        Files are written to a temporary sibling directory that then replaces
+        ``folder``, so a loaded store can be saved back to its own directory
+        (whose vectors it memory-maps) and a failed save leaves the previous
+        index intact. Saving an unchanged store to the directory it was
+        loaded from or last saved to is a no-op.
+
+        Parameters
+        ----------
+        folder : str
+            Target directory (created if missing).
+        """
+        self._ensure_codes()
+        target = os.path.abspath(folder)
+        if self._saved_to == target:
+            return
+
+        parent = os.path.dirname(target)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{os.path.basename(target)}.", dir=parent)
+        try:
+            os.chmod(staging, 0o755)
+            np.save(os.path.join(staging, "vectors.npy"), np.asarray(self._vectors))
+            np.save(os.path.join(staging, "codes.npy"), self._codes)
+            np.savez(os.path.join(staging, "quantizer.npz"), **self._params)
+
+            settings = {
+                "quantization": self.quantization,
+                "pq_subvectors": self.pq_subvectors,
+                "rescore_factor": self.rescore_factor,
+            }
+            with open(os.path.join(staging, "settings.json"), "w", encoding="utf-8") as f:
+                json.dump(settings, f)
+
+            with open(os.path.join(staging, "docs.jsonl"), "w", encoding="utf-8") as f:
+                for doc in self._docs:
+                    f.write(json.dumps({"id": doc.id, "text": doc.page_content, "metadata": doc.metadata}) + "\n")
+
+            # Swap directories; open memory maps keep the old files alive
+            retired = None
+            if os.path.exists(target):
+                retired = f"{staging}.old"
+                os.rename(target, retired)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                if retired:
+                    os.rename(retired, target)
+                raise
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        if retired:
+            shutil.rmtree(retired, ignore_errors=True)
+        self._saved_to = target
+
+    @classmethod
+    def load(cls, folder: str, embedding: Embeddings) -> QuantizedVectorStore:
+        """
+        Load a store saved with :meth:`save`.
+
+        Codes are loaded into memory; full-precision vectors are memory-mapped
+        and paged in as re-scored candidates touch them.
+        """
+        with open(os.path.join(folder, "settings.json"), encoding="utf-8") as f:
+            settings = json.load(f)
+        store = cls(embedding, **settings)
+
+        with open(os.path.join(folder, "docs.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                store._docs.append(
+                    Document(page_content=record["text"], metadata=record["metadata"], id=record["id"])
+                )
+                store._ids.append(record["id"])
+
+        store._vectors = np.load(os.path.join(folder, "vectors.npy"), mmap_mode="r")
+        store._codes = np.load(os.path.join(folder, "codes.npy"))
+        with np.load(os.path.join(folder, "quantizer.npz")) as params:
+            store._params = {name: params[name] for name in params.files}
+        store._saved_to = os.path.abspath(folder)
+        return store
+
+    @staticmethod
+    def exists(folder: str) -> bool:
+        """Return True if a saved store is present in ``folder``."""
+        return os.path.exists(os.path.join(folder, "settings.json"))
+
+    @property
+    def nbytes(self) -> int:
+        """Size in bytes of the in-memory quantized codes and codebooks."""
+        self._ensure_codes()
+        return int(self._codes.nbytes + sum(p.nbytes for p in self._params.values()))
+
+    # ----------------------------------------------------------
+    # Quantization internals
+    # ----------------------------------------------------------
+    def _ensure_codes(self) -> None:
+        """(Re)build quantized codes if vectors were added since the last build."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # One concatenation per build instead of one per added batch
+            existing = [] if self._vectors is None else [np.asarray(self._vectors)]
+            vectors = np.concatenate(existing + self._pending)
+            self._vectors, self._pending = vectors, []
+            if self.quantization == "int8":
+                self._params, self._codes = _train_int8(vectors)
+            else:
+                self._params, self._codes = _train_pq(vectors, self.pq_subvectors)
+            self._dirty = False
+
+    def _approximate_scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products between the query and every stored code."""
+        if self.quantization == "int8":
+            # x ≈ lo + (code + 128) * scale  =>  q·x ≈ q·lo + (q*scale)·(code + 128)
+            n = len(self._codes)
+            weights = query * self._params["scale"]
+            bias = float(query @ self._params["lo"]) + 128.0 * float(weights.sum())
+            scores = np.empty(n, dtype=np.float32)
+            buffer = np.empty((_DECODE_BLOCK, self._codes.shape[1]), dtype=np.float32)
+            for start in range(0, n, _DECODE_BLOCK):
+                block = self._codes[start : start + _DECODE_BLOCK]
+                decoded = buffer[: len(block)]
+                np.copyto(decoded, block, casting="unsafe")
+                np.dot(decoded, weights, out=scores[start : start + len(block)])
+            scores += bias
+        else:
+            # Asymmetric distance computation via a per-query lookup table;
+            # codes are (m, n) so each sub-vector gather is contiguous
+            centroids = self._params["centroids"]  # (m, 256, d/m)
+            m, _, dsub = centroids.shape
+            lut = np.einsum("mkd,md->mk", centroids, query.reshape(m, dsub))
+            scores = np.zeros(self._codes.shape[1], dtype=np.float32)
+            for j in range(m):
+                scores += lut[j][self._codes[j]]
+
+        return scores
+
+
+# --------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows so that inner product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return indices of the k largest scores (unordered)."""
+    if k >= len(scores):
+        return np.arange(len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def _train_int8(vectors: np.ndarray) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Fit per-dimension ranges and encode vectors as int8 codes."""
+    lo = vectors.min(axis=0)
+    hi = vectors.max(axis=0)
+    scale = np.maximum(hi - lo, 1e-12) / 255.0
+    codes = np.clip(np.rint((vectors - lo) / scale) - 128, -128, 127).astype(np.int8)
+    return {"lo": lo.astype(np.float32), "scale": scale.astype(np.float32)}, codes
+
+
+def _train_pq(vectors: np.ndarray, m: int) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Train one 256-centroid k-means codebook per sub-vector and encode."""
+    n, d = vectors.shape
+    if d % m:
+        raise ValueError(f"pq_subvectors={m} must divide the embedding dimension {d}")
+    dsub = d // m
+    ksub = min(256, n)
+
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(n, size=min(n, _KMEANS_SAMPLE), replace=False)]
+
+    centroids = np.zeros((m, 256, dsub), dtype=np.float32)
+    codes = np.empty((m, n), dtype=np.uint8)
+    for j in range(m):
+        sub = slice(j * dsub, (j + 1) * dsub)
+        centroids[j, :ksub] = _kmeans(np.ascontiguousarray(sample[:, sub]), ksub, rng)
+        codes[j] = _assign(vectors[:, sub], centroids[j, :ksub])
+    return {"centroids": centroids}, codes
+
+
+def _kmeans(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Plain Lloyd's k-means returning k centroids."""
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    for _ in range(_KMEANS_ITERS):
+        labels = _assign(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack(
+            [np.bincount(labels, weights=x[:, c], minlength=k) for c in range(x.shape[1])], axis=1
+        )
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def _assign(x: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest centroid (L2) for each row of x."""
+    labels = np.empty(len(x), dtype=np.int64)
+    c_norms = (centroids**2).sum(axis=1)
+    for start in range(0, len(x), _ASSIGN_BLOCK):
+        block = x[start : start + _ASSIGN_BLOCK]
+        dists = c_norms - 2.0 * (block @ centroids.T)
+        labels[start : start + len(block)] = dists.argmin(axis=1)
+    return labels
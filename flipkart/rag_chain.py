@@ -8,6 +8,8 @@ This module integrates:
 - Groq chat models for conversational responses.
 - AstraDB vector store as a retriever for contextual grounding.
 - LCEL (LangChain Core Runnable Expressions) for composable chain logic.
+- An optional cross-encoder re-ranking stage over an over-fetched
+  candidate set (enabled via `Config.RERANK_ENABLED`).
 
 Classes
 -------
@@ -18,23 +20,46 @@ Functions
 ---------
 _format_docs(docs: list) -> str
     Utility function to join retrieved document text into a single string.
+
+Attributes
+----------
+STAGES : tuple[str, ...]
+    Names of the chain stages reported in request durations and Prometheus.
 """
 
 # --------------------------------------------------------------
 # Imports
 # --------------------------------------------------------------
 from __future__ import annotations
-from typing import Dict, List
 
 from langchain_groq import ChatGroq
 from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
 from flipkart.config import Config
+from flipkart.prompts import HistoryCompressor, build_qa_prompt, build_rephrase_prompt, count_prompt_tokens
+from flipkart.reranker import CrossEncoderReranker
+from flipkart.session_cache import SessionCache
+from utils.profiling import PROFILING_ENABLED, StageProfiler, stage
+
+
+# Chain stages, in execution order. They never nest, so their durations add
+# up to the chain total. `rephrase`, `retrieve` and `rerank` are always
+# timed. The others are runnables timed by `StageProfiler` (run names) when
+# profiling is enabled.
+STAGES = (
+    "compact_history",
+    "rephrase",
+    "retrieve",
+    "rerank",
+    "format_docs",
+    "qa_prompt",
+    "qa_llm",
+    "qa_parse",
+)
 
 
 # --------------------------------------------------------------
@@ -65,9 +90,10 @@ class RAGChainBuilder:
     Build a message-history-aware RAG chain using LCEL.
 
     The RAG chain:
-    1. Rewrites user questions based on conversation history.
-    2. Retrieves relevant documents from AstraDB.
-    3. Generates concise, context-grounded answers using Groq chat models.
+    1. Compacts older conversation turns into a rolling summary.
+    2. Rewrites follow-up questions based on conversation history.
+    3. Retrieves relevant documents from AstraDB.
+    4. Generates concise, context-grounded answers using Groq chat models.
 
     Parameters
     ----------
@@ -78,8 +104,14 @@ class RAGChainBuilder:
     ----------
     model : ChatGroq
         Groq chat model instance used for rewriting and answering.
-    history_store : Dict[str, ChatMessageHistory]
-        In-memory dictionary storing per-session chat histories.
+    history_store : SessionCache
+        Bounded in-memory mapping of session ID to chat history; idle and
+        least recently used sessions are evicted.
+    compressor : HistoryCompressor
+        Maintains per-session rolling summaries of older conversation turns.
+    reranker : CrossEncoderReranker | None
+        Cross-encoder used to re-rank retrieved candidates, or None when
+        re-ranking is disabled.
     """
 
     def __init__(self, vector_store):
@@ -89,8 +121,14 @@ class RAGChainBuilder:
         # Initialise the Groq model with a moderate creativity level
         self.model = ChatGroq(model=Config.RAG_MODEL, temperature=1)
 
-        # Session-based message history storage
-        self.history_store: Dict[str, ChatMessageHistory] = {}
+        # Session-based message history storage (LRU + idle-time eviction)
+        self.history_store = SessionCache()
+
+        # Rolling summariser that keeps prompt history short
+        self.compressor = HistoryCompressor(self.model)
+
+        # Optional cross-encoder re-ranker (loaded once, reused per request)
+        self.reranker = CrossEncoderReranker() if Config.RERANK_ENABLED else None
 
     def _get_history(self, session_id: str) -> BaseChatMessageHistory:
         """
@@ -106,9 +144,47 @@ class RAGChainBuilder:
         BaseChatMessageHistory
             The chat history object associated with the session.
         """
-        if session_id not in self.history_store:
-            self.history_store[session_id] = ChatMessageHistory()
-        return self.history_store[session_id]
+        history = self.history_store.get(session_id)
+        if history is None:
+            history = self.history_store[session_id] = ChatMessageHistory()
+        return history
+
+    def has_history(self, session_id: str) -> bool:
+        """
+        Check whether a session already has conversation turns.
+
+        Parameters
+        ----------
+        session_id : str
+            Unique identifier for the user session.
+
+        Returns
+        -------
+        bool
+            True if the session has at least one stored message.
+        """
+        history = self.history_store.get(session_id)
+        return bool(history and history.messages)
+
+    def record_turn(self, session_id: str, question: str, answer: str) -> None:
+        """
+        Append a question/answer pair produced outside this session's chain run.
+
+        Used when a request is answered from a shared result (e.g. a coalesced
+        request) so the session's history stays consistent for follow-ups.
+
+        Parameters
+        ----------
+        session_id : str
+            Unique identifier for the user session.
+        question : str
+            The user's message.
+        answer : str
+            The answer returned to the user.
+        """
+        history = self._get_history(session_id)
+        history.add_user_message(question)
+        history.add_ai_message(answer)
 
     def build_chain(self) -> RunnableWithMessageHistory:
         """
@@ -119,72 +195,71 @@ class RAGChainBuilder:
         RunnableWithMessageHistory
             Runnable chain that supports message persistence and retrieval.
         """
-        # Create retriever from the AstraDB vector store
-        retriever = self.vector_store.as_retriever(search_kwargs={"k": 3})
+        # Create retriever from the AstraDB vector store; over-fetch candidates
+        # when a re-ranker will narrow them down to the final top-k
+        fetch_k = Config.RERANK_FETCH_K if self.reranker else Config.RETRIEVER_K
+        retriever = self.vector_store.as_retriever(search_kwargs={"k": fetch_k})
+
+        # ----------------------------------------------------------
+        # 1. History Compaction — rolling summary + recent turns
+        # ----------------------------------------------------------
+        def compact_history(inputs: dict, config: RunnableConfig) -> dict:
+            session_id = config.get("configurable", {}).get("session_id", "")
+            return {
+                "input": inputs["input"],
+                "chat_history": self.compressor.compact(inputs["chat_history"], session_id),
+            }
 
         # ----------------------------------------------------------
-        # 1. Question Rewriting — make questions standalone
+        # 2. Question Rewriting — make questions standalone
         # ----------------------------------------------------------
-        rephrase_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    (
-                        "Given the chat history and user question, "
-                        "rewrite it as a standalone question."
-                    ),
-                ),
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("human", "{input}"),
-            ]
+        rephrase_chain = (
+            build_rephrase_prompt()
+            | RunnableLambda(lambda p: count_prompt_tokens(p, "rephrase"))
+            | self.model
+            | StrOutputParser()
         )
-        rephrase_chain = rephrase_prompt | self.model | StrOutputParser()
 
         # ----------------------------------------------------------
-        # 2. History-Aware Retrieval — use rewritten query
+        # 3. History-Aware Retrieval — use rewritten query
         # ----------------------------------------------------------
         def retrieve_with_history(inputs: dict):
-            # Rephrase the user’s query using conversation context
-            rewritten = rephrase_chain.invoke(
-                {"input": inputs["input"], "chat_history": inputs["chat_history"]}
-            )
+            # A first-turn question is already standalone: skip the LLM call
+            rewritten = inputs["input"]
+            if inputs["chat_history"]:
+                # Rephrase the user’s query using conversation context
+                with stage("rephrase"):
+                    rewritten = rephrase_chain.invoke(inputs)
             # Retrieve relevant context from AstraDB
-            return retriever.invoke(rewritten)
+            with stage("retrieve"):
+                docs = retriever.invoke(rewritten)
+            # Keep only the best candidates according to the cross-encoder
+            if self.reranker:
+                with stage("rerank"):
+                    docs = self.reranker.rerank(rewritten, docs)
+            return docs
 
         history_aware_retriever = RunnableLambda(retrieve_with_history)
 
-        # ----------------------------------------------------------
-        # 3. QA Prompt — combine context with rewritten question
-        # ----------------------------------------------------------
-        qa_prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    (
-                        "You're an e-commerce assistant answering product-related queries "
-                        "using reviews and titles. Stick to the provided context. "
-                        "Be concise and helpful.\n\n"
-                        "CONTEXT:\n{context}\n\nQUESTION: {input}"
-                    ),
-                ),
-                MessagesPlaceholder(variable_name="chat_history"),
-                ("human", "{input}"),
-            ]
-        )
-
         # ----------------------------------------------------------
         # 4. RAG Assembly — combine retriever, prompt, model, and parser
         # ----------------------------------------------------------
+        # Stages are named runnables; the callback handler times them by run
+        # name, so every runnable keeps its native stream/batch/ainvoke
         rag_chain = (
-            {
-                "context": history_aware_retriever | RunnableLambda(_format_docs),
-                "input": RunnablePassthrough(),                                 # Forward the user query
-                "chat_history": RunnableLambda(lambda x: x["chat_history"]),    # Include message history
+            RunnableLambda(compact_history, name="compact_history")
+            | {
+                "context": history_aware_retriever | RunnableLambda(_format_docs, name="format_docs"),
+                "input": RunnableLambda(lambda x: x["input"]),                  # Forward the user query
+                "chat_history": RunnableLambda(lambda x: x["chat_history"]),    # Include compacted history
             }
-            | qa_prompt
-            | self.model
-            | StrOutputParser()
+            | build_qa_prompt().with_config(run_name="qa_prompt")
+            | RunnableLambda(lambda p: count_prompt_tokens(p, "qa"))
+            | self.model.with_config(run_name="qa_llm")
+            | StrOutputParser().with_config(run_name="qa_parse")
         )
+        if PROFILING_ENABLED:
+            rag_chain = rag_chain.with_config(callbacks=[StageProfiler(STAGES)])
 
         # ----------------------------------------------------------
         # 5. Message History Integration
@@ -0,0 +1,112 @@
+"""
+reranker.py
+
+Cross-encoder re-ranking stage for the Flipkart Product Recommender RAG chain.
+
+The vector store retrieves candidates by embedding similarity only. This
+module re-scores an over-fetched candidate set with a small local
+cross-encoder, which reads the query and each review together, and keeps
+only the highest-scoring documents for the LLM prompt.
+
+Classes
+-------
+CrossEncoderReranker
+    Scores (query, document) pairs in one batched forward pass and returns
+    the top-N documents.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import statistics
+import time
+
+from langchain_core.documents import Document
+
+from flipkart.config import Config
+from utils.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class CrossEncoderReranker:
+    """
+    Re-rank retrieved documents with a local CPU cross-encoder.
+
+    The `sentence-transformers` dependency is imported lazily so that the
+    default (re-ranking disabled) deployment does not need to install it.
+
+    Parameters
+    ----------
+    model_name : str, default=Config.RERANK_MODEL
+        Hugging Face identifier of the cross-encoder model.
+    top_n : int, default=Config.RETRIEVER_K
+        Number of documents kept after re-ranking.
+
+    Methods
+    -------
+    rerank(query: str, docs: list[Document]) -> list[Document]
+        Score all candidates in a single batch and return the top-N.
+    """
+
+    def __init__(self, model_name: str = Config.RERANK_MODEL, top_n: int = Config.RETRIEVER_K):
+        # Deferred import: only required when re-ranking is enabled
+        from sentence_transformers import CrossEncoder
+
+        self.model_name = model_name
+        self.top_n = top_n
+
+        # Load the cross-encoder once on CPU; it is reused across requests
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def rerank(self, query: str, docs: list[Document]) -> list[Document]:
+        """
+        Score each candidate against the query and keep the best documents.
+
+        Parameters
+        ----------
+        query : str
+            The standalone (rewritten) user question.
+        docs : list[Document]
+            Candidate documents returned by the retriever.
+
+        Returns
+        -------
+        list[Document]
+            The `top_n` documents ordered by descending cross-encoder score.
+            Each returned copy's metadata gains a `rerank_score` entry; the
+            input documents are left unchanged.
+        """
+        if not docs:
+            return []
+
+        # Score every (query, review) pair in one forward pass
+        start = time.perf_counter()
+        pairs = [(query, d.page_content) for d in docs]
+        scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        # Sort candidates by score and keep the top-N
+        ranked = sorted(zip(docs, scores), key=lambda pair: float(pair[1]), reverse=True)
+        top = ranked[: self.top_n]
+
+        # Log latency and the score distribution for offline tuning
+        values = [float(s) for s in scores]
+        logger.info(
+            "Re-ranked %d candidates in %.1f ms | scores min=%.3f median=%.3f max=%.3f | kept=%s",
+            len(values),
+            elapsed_ms,
+            min(values),
+            statistics.median(values),
+            max(values),
+            [round(float(s), 3) for _, s in top],
+        )
+
+        # Attach scores to copies; the retriever's documents may be shared or cached
+        return [
+            doc.model_copy(update={"metadata": {**doc.metadata, "rerank_score": float(score)}})
+            for doc, score in top
+        ]
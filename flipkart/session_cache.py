@@ -0,0 +1,95 @@
+"""
+session_cache.py
+
+Bounded storage for per-session state (chat histories, rolling summaries).
+
+Every chat session adds entries to in-memory state. This module stores
+them in a thread-safe mapping that keeps at most a fixed number of sessions.
+It evicts the least recently used session once the limit is reached, and
+drops sessions that have been idle for longer than a time-to-live.
+
+Classes
+-------
+SessionCache
+    LRU + TTL mapping keyed by session ID.
+"""
+
+# --------------------------------------------------------------
+# Imports
+# --------------------------------------------------------------
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Tuple
+
+from flipkart.config import Config
+
+
+class SessionCache(MutableMapping):
+    """
+    Thread-safe mapping with least-recently-used and idle-time eviction.
+
+    Reading or writing a session marks it as recently used. Expired
+    sessions are removed lazily whenever the cache is accessed, oldest
+    first, so eviction costs O(1) amortised per operation.
+
+    Parameters
+    ----------
+    max_entries : int, default=Config.SESSION_MAX_ENTRIES
+        Maximum number of sessions kept.
+    ttl : float, default=Config.SESSION_TTL_SECONDS
+        Seconds of inactivity after which a session is dropped.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = Config.SESSION_MAX_ENTRIES,
+        ttl: float = Config.SESSION_TTL_SECONDS,
+    ):
+        self.max_entries = max(max_entries, 1)
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        # session ID -> (value, last access time), least recently used first
+        self._data: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            self._expire()
+            value, _ = self._data[key]
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._expire()
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            self._expire()
+            return iter(list(self._data))
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._data)
+
+    def _expire(self) -> None:
+        """Drop sessions idle for longer than the TTL (oldest are first)."""
+        deadline = time.monotonic() - self.ttl
+        while self._data:
+            _, (_, last) = next(iter(self._data.items()))
+            if last >= deadline:
+                break
+            self._data.popitem(last=False)
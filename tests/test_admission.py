@@ -0,0 +1,189 @@
+"""
+Unit tests for admission control: the global concurrency limit and the
+per-session token bucket.
+"""
+
+import threading
+import time
+
+import pytest
+
+import flipkart.admission as admission
+from flipkart.admission import AdmissionController, AdmissionRejected, TokenBucketLimiter
+
+
+def _hold_slot(controller: AdmissionController, release: threading.Event, order: list, name: str):
+    """Thread target: take a slot, note the order, keep it until `release` is set."""
+    try:
+        with controller.slot():
+            order.append(name)
+            release.wait(5)
+    except AdmissionRejected as e:
+        order.append(f"{name}:{e.reason}")
+
+
+def _wait_for_requests(controller: AdmissionController, n: int) -> None:
+    """Wait until n requests are running or queued."""
+    deadline = time.monotonic() + 2
+    while controller._in_flight + len(controller._waiters) < n and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+# --------------------------------------------------------------
+# AdmissionController
+# --------------------------------------------------------------
+def test_slots_are_handed_to_waiters_in_arrival_order():
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=5)
+    release, order = threading.Event(), []
+
+    threads = []
+    for i, name in enumerate(["first", "second", "third", "fourth"]):
+        t = threading.Thread(target=_hold_slot, args=(controller, release, order, name))
+        t.start()
+        threads.append(t)
+        _wait_for_requests(controller, i + 1)
+
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert order == ["first", "second", "third", "fourth"]
+    assert controller._in_flight == 0 and not controller._waiters
+
+
+def test_full_queue_rejects_immediately_with_503():
+    controller = AdmissionController(max_concurrency=1, max_queue=1, queue_timeout=5)
+    release, order = threading.Event(), []
+    holder = threading.Thread(target=_hold_slot, args=(controller, release, order, "holder"))
+    waiter = threading.Thread(target=_hold_slot, args=(controller, release, order, "waiter"))
+    holder.start()
+    _wait_for_requests(controller, 1)
+    waiter.start()
+    _wait_for_requests(controller, 2)
+
+    start = time.perf_counter()
+    with pytest.raises(AdmissionRejected) as info:
+        with controller.slot():
+            pass
+    elapsed = time.perf_counter() - start
+
+    release.set()
+    holder.join()
+    waiter.join()
+    assert (info.value.reason, info.value.status) == ("queue_full", 503)
+    assert info.value.retry_after >= 1
+    assert elapsed < 0.5
+
+
+def test_queued_request_times_out_and_leaves_the_queue():
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=0.1)
+    release, order = threading.Event(), []
+    holder = threading.Thread(target=_hold_slot, args=(controller, release, order, "holder"))
+    holder.start()
+    _wait_for_requests(controller, 1)
+
+    with pytest.raises(AdmissionRejected) as info:
+        with controller.slot():
+            pass
+
+    assert info.value.reason == "queue_timeout"
+    assert not controller._waiters
+    release.set()
+    holder.join()
+    assert controller._in_flight == 0
+
+
+def test_slot_handed_over_as_the_wait_expires_is_kept(monkeypatch):
+    controller = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=0.1)
+    controller._acquire()  # occupy the only slot
+
+    class RacingEvent(threading.Event):
+        def wait(self, timeout=None):
+            # The holder releases exactly when the waiter's timeout fires
+            controller._release()
+            return False
+
+    monkeypatch.setattr(admission.threading, "Event", RacingEvent)
+    with controller.slot():
+        assert controller._in_flight == 1
+
+    assert controller._in_flight == 0 and not controller._waiters
+
+
+def test_concurrency_never_exceeds_the_limit():
+    controller = AdmissionController(max_concurrency=3, max_queue=100, queue_timeout=5)
+    lock, running, peak = threading.Lock(), [0], [0]
+
+    def work():
+        with controller.slot():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak[0] == 3
+    assert controller._in_flight == 0
+
+
+# --------------------------------------------------------------
+# TokenBucketLimiter
+# --------------------------------------------------------------
+def test_bucket_allows_a_burst_then_rejects_with_429():
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=3)
+    for _ in range(3):
+        limiter.check("session")
+
+    with pytest.raises(AdmissionRejected) as info:
+        limiter.check("session")
+
+    assert (info.value.reason, info.value.status, info.value.retry_after) == ("rate_limited", 429, 1)
+
+
+def test_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1)
+
+    limiter.check("session")
+    with pytest.raises(AdmissionRejected):
+        limiter.check("session")
+
+    now[0] += 1.0
+    limiter.check("session")
+
+
+def test_sessions_have_independent_buckets():
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1)
+    limiter.check("a")
+    limiter.check("b")
+    with pytest.raises(AdmissionRejected):
+        limiter.check("a")
+
+
+def test_tracked_sessions_are_bounded():
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1, max_keys=10)
+    for i in range(100):
+        limiter.check(f"session-{i}")
+    assert len(limiter._buckets) == 10
+
+
+def test_zero_rate_disables_limiting():
+    limiter = TokenBucketLimiter(rate_per_minute=0, burst=1)
+    for _ in range(100):
+        limiter.check("session")
+
+
+def test_client_bucket_rejects_with_its_own_reason():
+    limiter = TokenBucketLimiter(rate_per_minute=60, burst=1, reason="client_rate_limited")
+    limiter.check("10.0.0.1")
+    with pytest.raises(AdmissionRejected) as info:
+        limiter.check("10.0.0.1")
+    assert (info.value.reason, info.value.status) == ("client_rate_limited", 429)
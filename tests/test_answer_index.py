@@ -0,0 +1,141 @@
+"""
+Unit tests for the precomputed answer index and offline question mining.
+"""
+
+import json
+import math
+import os
+from collections import Counter
+
+import pytest
+
+import flipkart.answer_index as answer_index
+from flipkart.answer_index import AnswerIndex, _match_product, _tokens, mine_frequent_questions
+
+
+PRODUCTS = [
+    "realme Buds Wireless Bluetooth Headset",
+    "realme Buds Q Bluetooth Headset",
+    "realme Buds Air Bluetooth Headset",
+    "boAt Airdopes 141 Bluetooth Headset",
+    "Noise Buds VS104 Bluetooth Headset",
+]
+
+
+def _write_log(path, records: list) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+    return str(path)
+
+
+def _request(question: str, first_turn: bool = True) -> dict:
+    return {"event": "rag_request", "first_turn": first_turn, "input": question}
+
+
+def _index_inputs(products: list) -> tuple:
+    title_tokens = {name: _tokens(name) for name in products}
+    df = Counter(t for tokens in title_tokens.values() for t in tokens)
+    idf = {t: math.log(1 + len(title_tokens) / n) for t, n in df.items()}
+    return title_tokens, idf
+
+
+# --------------------------------------------------------------
+# Product matching
+# --------------------------------------------------------------
+def test_distinctive_title_tokens_decide_the_match():
+    title_tokens, idf = _index_inputs(PRODUCTS)
+
+    assert _match_product("is the airdopes 141 battery good", title_tokens, idf) == PRODUCTS[3]
+    assert _match_product("vs104 bass quality", title_tokens, idf) == PRODUCTS[4]
+    assert _match_product("what is the weather today", title_tokens, idf) is None
+
+
+def test_mining_breaks_ties_the_same_way_whatever_the_title_order(tmp_path):
+    log = _write_log(tmp_path / "app.jsonl", [_request("realme buds battery life?")] * 3)
+
+    results = {
+        tuple(mine_frequent_questions([log], order, min_count=1))
+        for order in (PRODUCTS, PRODUCTS[::-1], sorted(PRODUCTS, key=len))
+    }
+
+    # "realme buds" matches the three realme titles equally
+    assert results == {(sorted(PRODUCTS[:3])[0],)}
+
+
+# --------------------------------------------------------------
+# Mining
+# --------------------------------------------------------------
+def test_mining_counts_first_turn_questions_per_product(tmp_path):
+    log = _write_log(
+        tmp_path / "app.jsonl",
+        [_request("Airdopes 141 battery?")] * 3
+        + [_request("airdopes 141  battery")]
+        + [_request("airdopes 141 battery", first_turn=False)] * 5
+        + [_request("vs104 bass")] * 2
+        + ["not json", {"event": "rag_rejected", "input": "airdopes 141 battery"}],
+    )
+
+    mined = mine_frequent_questions([log], PRODUCTS, min_count=3)
+
+    assert mined == {PRODUCTS[3]: [("airdopes 141 battery", 4)]}
+
+
+def test_mining_keeps_the_most_frequent_questions_per_product(tmp_path):
+    records = []
+    for i, question in enumerate(["airdopes 141 price", "airdopes 141 bass", "airdopes 141 fit"]):
+        records += [_request(question)] * (10 - i)
+    log = _write_log(tmp_path / "app.jsonl", records)
+
+    mined = mine_frequent_questions([log], PRODUCTS, min_count=1, top_per_product=2)
+
+    assert mined == {PRODUCTS[3]: [("airdopes 141 price", 10), ("airdopes 141 bass", 9)]}
+
+
+def test_mining_without_logs_fails_loudly():
+    with pytest.raises(FileNotFoundError):
+        mine_frequent_questions([], PRODUCTS)
+
+
+def test_mining_logs_without_question_text_fails_loudly(tmp_path):
+    log = _write_log(tmp_path / "app.jsonl", [{"event": "rag_request", "first_turn": True, "input_chars": 20}])
+
+    with pytest.raises(ValueError, match="LOG_QUERY_TEXT"):
+        mine_frequent_questions([log], PRODUCTS)
+
+
+# --------------------------------------------------------------
+# AnswerIndex
+# --------------------------------------------------------------
+def test_saved_answers_are_served_by_normalised_question(tmp_path):
+    path = str(tmp_path / "answers.json")
+    index = AnswerIndex(path)
+    index.add("Is the Airdopes 141 battery good?", "Yes.", PRODUCTS[3], 12)
+    index.save()
+
+    served = AnswerIndex(path)
+
+    assert served.get("is the  airdopes 141 battery good") == "Yes."
+    assert served.get("something else") is None
+    assert len(served) == 1
+
+
+def test_index_reloads_a_replaced_file_and_forgets_an_invalidated_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_index, "_RELOAD_INTERVAL", 0.0)
+    path = str(tmp_path / "answers.json")
+    writer = AnswerIndex(path)
+    writer.add("q1", "first", PRODUCTS[0], 3)
+    writer.save()
+
+    served = AnswerIndex(path)
+    assert served.get("q1") == "first"
+
+    writer.add("q1", "second", PRODUCTS[0], 3)
+    writer.save()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert served.get("q1") == "second"
+
+    assert AnswerIndex.invalidate(path) is True
+    assert served.get("q1") is None
+    assert AnswerIndex.invalidate(path) is False
@@ -0,0 +1,94 @@
+"""
+Unit tests for single-flight request coalescing.
+"""
+
+import threading
+import time
+
+import pytest
+
+from flipkart.coalescing import CoalescedCallError, SingleFlight, normalize_query
+
+
+def _run_concurrently(flight: SingleFlight, fn, n: int) -> list:
+    """Call `flight.do("key", fn)` from n threads; return results or exceptions."""
+    results = [None] * n
+
+    def worker(i: int) -> None:
+        try:
+            results[i] = flight.do("key", fn)
+        except BaseException as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_normalize_query_collapses_trivial_differences():
+    assert normalize_query("  Best   Earphones?? ") == "best earphones"
+    assert normalize_query("best earphones") == normalize_query("BEST earphones!")
+
+
+def test_concurrent_duplicates_share_one_run():
+    calls = []
+    started = threading.Event()
+
+    def fn():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "answer"
+
+    results = _run_concurrently(SingleFlight(timeout=5), fn, 5)
+
+    assert len(calls) == 1
+    assert [r[0] for r in results] == ["answer"] * 5
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+
+
+def test_key_is_released_after_the_leader_finishes():
+    flight = SingleFlight(timeout=5)
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+
+
+def test_followers_get_fresh_exceptions_chained_to_the_leaders():
+    error = ValueError("boom")
+
+    def fn():
+        time.sleep(0.2)
+        raise error
+
+    results = _run_concurrently(SingleFlight(timeout=5), fn, 4)
+
+    leader = [r for r in results if r is error]
+    followers = [r for r in results if isinstance(r, CoalescedCallError)]
+    assert len(leader) == 1 and len(followers) == 3
+    assert len({id(f) for f in followers}) == 3
+    assert all(f.__cause__ is error for f in followers)
+
+
+def test_follower_runs_its_own_call_when_the_leader_hangs():
+    flight = SingleFlight(timeout=0.1)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+
+    start = time.perf_counter()
+    result = flight.do("key", lambda: "own answer")
+    elapsed = time.perf_counter() - start
+
+    release.set()
+    leader.join()
+    assert result == ("own answer", False)
+    assert elapsed < 1
+
+
+def test_leader_exception_propagates_unchanged():
+    with pytest.raises(KeyError):
+        SingleFlight().do("key", lambda: {}["missing"])
@@ -0,0 +1,115 @@
+"""
+Unit tests for CSV loading and the Arrow snapshot cache.
+"""
+
+import os
+
+import pandas as pd
+
+import flipkart.data_converter as data_converter
+from flipkart.data_converter import DataConverter
+
+
+def _write_csv(path, reviews: list[str]) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(
+        {
+            "product_id": [f"P{i}" for i in range(len(reviews))],
+            "product_title": [f" Title {i} " for i in range(len(reviews))],
+            "rating": [5] * len(reviews),
+            "summary": ["ok"] * len(reviews),
+            "review": reviews,
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+def _snapshots(snapshot_dir) -> list[str]:
+    return sorted(os.listdir(snapshot_dir))
+
+
+def _count_parses(monkeypatch) -> list[str]:
+    """Record every CSV parse performed by the converter."""
+    parsed = []
+    read_csv = pd.read_csv
+
+    def counting_read_csv(path, *args, **kwargs):
+        parsed.append(path)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(data_converter.pd, "read_csv", counting_read_csv)
+    return parsed
+
+
+# --------------------------------------------------------------
+# Conversion
+# --------------------------------------------------------------
+def test_convert_cleans_text_and_drops_incomplete_rows(tmp_path):
+    csv = _write_csv(tmp_path / "reviews.csv", ["  great  ", None, "fine"])
+
+    docs = DataConverter(csv, snapshot_dir=str(tmp_path / "snap")).convert()
+
+    assert [d.page_content for d in docs] == ["great", "fine"]
+    assert [d.metadata["product_name"] for d in docs] == ["Title 0", "Title 2"]
+
+
+def test_batches_cover_every_row(tmp_path):
+    csv = _write_csv(tmp_path / "reviews.csv", [f"review {i}" for i in range(25)])
+
+    batches = list(DataConverter(csv, snapshot_dir=str(tmp_path / "snap")).iter_batches(batch_size=10))
+
+    assert [len(b) for b in batches] == [10, 10, 5]
+
+
+# --------------------------------------------------------------
+# Snapshot cache
+# --------------------------------------------------------------
+def test_snapshot_is_reused_while_the_csv_is_unchanged(tmp_path, monkeypatch):
+    csv = _write_csv(tmp_path / "reviews.csv", ["a", "b"])
+    snap = str(tmp_path / "snap")
+    parsed = _count_parses(monkeypatch)
+
+    DataConverter(csv, snapshot_dir=snap).convert()
+    DataConverter(csv, snapshot_dir=snap).convert()
+
+    assert len(parsed) == 1
+    assert len(_snapshots(snap)) == 1
+
+
+def test_editing_the_csv_rebuilds_and_replaces_its_snapshot(tmp_path, monkeypatch):
+    csv = _write_csv(tmp_path / "reviews.csv", ["a", "b"])
+    snap = str(tmp_path / "snap")
+    parsed = _count_parses(monkeypatch)
+
+    old = DataConverter(csv, snapshot_dir=snap).snapshot_path()
+    DataConverter(csv, snapshot_dir=snap).convert()
+    _write_csv(tmp_path / "reviews.csv", ["a", "b", "c"])
+    docs = DataConverter(csv, snapshot_dir=snap).convert()
+
+    assert len(parsed) == 2
+    assert len(docs) == 3
+    assert _snapshots(snap) == [os.path.basename(DataConverter(csv, snapshot_dir=snap).snapshot_path())]
+    assert not os.path.exists(old)
+
+
+def test_cleanup_keeps_snapshots_of_other_csvs(tmp_path, monkeypatch):
+    snap = str(tmp_path / "snap")
+    csvs = [
+        _write_csv(tmp_path / "reviews.csv", ["a"]),
+        _write_csv(tmp_path / "reviews.v2.csv", ["b"]),
+        _write_csv(tmp_path / "exports" / "2024" / "reviews.csv", ["c"]),
+        _write_csv(tmp_path / "exports" / "2025" / "reviews.csv", ["d"]),
+    ]
+    parsed = _count_parses(monkeypatch)
+    unrelated = os.path.join(snap, "reviews.notes.arrow")
+    os.makedirs(snap)
+    open(unrelated, "w").close()
+
+    # Alternating loads reuse each file's own snapshot
+    for _ in range(2):
+        for csv in csvs:
+            DataConverter(csv, snapshot_dir=snap).convert()
+
+    assert len(parsed) == len(csvs)
+    assert len(_snapshots(snap)) == len(csvs) + 1
+    assert os.path.exists(unrelated)
@@ -0,0 +1,51 @@
+"""
+Unit tests for the asynchronous (JSON) logging pipeline.
+"""
+
+import json
+import logging
+import queue
+
+from utils.logger import JsonFormatter, _ContextFilter, _JsonQueueHandler, request_context
+
+
+def _log_through_queue(log) -> dict:
+    """Log via the queue handler, then format the queued record as the listener would."""
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _JsonQueueHandler(records)
+    handler.addFilter(_ContextFilter())
+    logger = logging.getLogger("tests.logger")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        log(logger)
+    finally:
+        logger.removeHandler(handler)
+    return json.loads(JsonFormatter().format(records.get_nowait()))
+
+
+def test_exception_traceback_is_a_separate_field():
+    def log(logger):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Failed for %s", "q1")
+
+    payload = _log_through_queue(log)
+
+    assert payload["message"] == "Failed for q1"
+    assert "ZeroDivisionError" in payload["exc_info"]
+    assert payload["exc_info"].startswith("Traceback")
+
+
+def test_context_ids_and_extra_fields_survive_the_queue():
+    def log(logger):
+        with request_context("req-1", "sess-1"):
+            logger.info("Served", extra={"event": "rag_request"})
+
+    payload = _log_through_queue(log)
+
+    assert (payload["request_id"], payload["session_id"]) == ("req-1", "sess-1")
+    assert payload["event"] == "rag_request"
+    assert "exc_info" not in payload
@@ -0,0 +1,116 @@
+"""
+Unit tests for history compaction: rolling summaries and the token budget.
+"""
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, get_buffer_string
+
+from flipkart.prompts import HistoryCompressor
+
+
+class RecordingChatModel(FakeListChatModel):
+    """Fake chat model that also keeps every prompt it was sent."""
+
+    prompts: list = []
+
+    def _call(self, messages, stop=None, run_manager=None, **kwargs):
+        self.prompts.append(get_buffer_string(messages))
+        return super()._call(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+def _turns(n: int, words: int = 1) -> list:
+    """`n` alternating human / AI messages, numbered from 0."""
+    return [
+        (HumanMessage if i % 2 == 0 else AIMessage)(content=" ".join([f"m{i}"] * words))
+        for i in range(n)
+    ]
+
+
+def _compressor(**kwargs) -> tuple:
+    model = RecordingChatModel(responses=["summary-1", "summary-2", "summary-3"])
+    settings = {"keep_messages": 2, "summary_chunk": 4, "token_budget": 10_000, **kwargs}
+    return model, HistoryCompressor(model, **settings)
+
+
+# --------------------------------------------------------------
+# Rolling summary
+# --------------------------------------------------------------
+def test_short_history_is_sent_verbatim_without_summarising():
+    model, compressor = _compressor()
+    messages = _turns(6)
+
+    assert compressor.compact(messages, "s1") == messages
+    assert model.prompts == []
+
+
+def test_full_chunk_is_folded_into_the_summary_once():
+    model, compressor = _compressor()
+    messages = _turns(8)
+
+    compacted = compressor.compact(messages, "s1")
+
+    assert compacted == [
+        SystemMessage(content="Summary of the earlier conversation: summary-1"),
+        *messages[6:],
+    ]
+    assert len(model.prompts) == 1
+    assert "m5" in model.prompts[0] and "m6" not in model.prompts[0]
+    assert compressor.summaries["s1"] == ("summary-1", 6)
+
+    # Later turns reuse the summary until another full chunk overflows
+    compacted = compressor.compact(_turns(12), "s1")
+    assert [m.content for m in compacted[1:]] == [f"m{i}" for i in range(6, 12)]
+    assert len(model.prompts) == 1
+
+    compacted = compressor.compact(_turns(14), "s1")
+    assert compacted[0].content.endswith("summary-2")
+    assert [m.content for m in compacted[1:]] == ["m12", "m13"]
+    assert "summary-1" in model.prompts[1] and "m6" in model.prompts[1]
+    assert compressor.summaries["s1"] == ("summary-2", 12)
+
+
+def test_sessions_keep_separate_summaries():
+    _, compressor = _compressor()
+    compressor.compact(_turns(8), "s1")
+
+    assert compressor.compact(_turns(4), "s2") == _turns(4)
+    assert "s2" not in compressor.summaries
+
+
+def test_stale_summary_is_dropped_when_history_restarts():
+    model, compressor = _compressor()
+    compressor.compact(_turns(8), "s1")
+
+    # The history store evicted the session and it started over
+    restarted = _turns(2)
+    assert compressor.compact(restarted, "s1") == restarted
+    assert "s1" not in compressor.summaries
+    assert len(model.prompts) == 1
+
+
+# --------------------------------------------------------------
+# Token budget
+# --------------------------------------------------------------
+def test_history_is_trimmed_to_the_token_budget():
+    _, compressor = _compressor(keep_messages=20, token_budget=60)
+    messages = _turns(10, words=10)
+
+    compacted = compressor.compact(messages, "s1")
+
+    assert count_tokens_approximately(compacted) <= 60
+    assert compacted == messages[-len(compacted):]
+    assert isinstance(compacted[0], HumanMessage)
+
+
+def test_trimming_keeps_the_summary_and_drops_the_oldest_turns():
+    _, compressor = _compressor(keep_messages=4, token_budget=45)
+    messages = _turns(10, words=10)
+
+    compacted = compressor.compact(messages, "s1")
+
+    assert compacted == [
+        SystemMessage(content="Summary of the earlier conversation: summary-1"),
+        *messages[8:],
+    ]
+    assert count_tokens_approximately(compacted) <= 45
@@ -0,0 +1,162 @@
+"""
+Unit tests for the int8 / product-quantized local vector store.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from flipkart.quantized_store import QuantizedVectorStore, _normalise, _train_int8, _train_pq
+
+
+DIM = 64
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    """Low intrinsic-dimension vectors, similar in structure to text embeddings."""
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((8, DIM)).astype(np.float32)
+    return rng.standard_normal((n, 8)).astype(np.float32) @ basis + 0.1 * rng.standard_normal((n, DIM)).astype(
+        np.float32
+    )
+
+
+def _store(quantization: str, vectors: np.ndarray) -> QuantizedVectorStore:
+    store = QuantizedVectorStore(
+        DeterministicFakeEmbedding(size=DIM), quantization=quantization, pq_subvectors=16
+    )
+    texts = [f"doc-{i}" for i in range(len(vectors))]
+    store.add_embeddings(texts, vectors, metadatas=[{"row": i} for i in range(len(vectors))])
+    return store
+
+
+# --------------------------------------------------------------
+# Encoding
+# --------------------------------------------------------------
+def test_int8_round_trip_error_is_bounded_by_half_a_step():
+    vectors = _normalise(_vectors(500))
+    params, codes = _train_int8(vectors)
+
+    assert codes.dtype == np.int8 and codes.shape == vectors.shape
+    decoded = params["lo"] + (codes.astype(np.float32) + 128) * params["scale"]
+    assert np.all(np.abs(decoded - vectors) <= params["scale"] / 2 + 1e-6)
+
+
+def test_pq_codes_are_subvector_major_bytes():
+    vectors = _normalise(_vectors(600))
+    params, codes = _train_pq(vectors, m=16)
+
+    assert codes.dtype == np.uint8 and codes.shape == (16, 600)
+    assert params["centroids"].shape == (16, 256, DIM // 16)
+
+
+def test_pq_rejects_subvector_count_not_dividing_dimension():
+    with pytest.raises(ValueError):
+        _train_pq(_normalise(_vectors(100)), m=7)
+
+
+def test_unknown_quantization_is_rejected():
+    with pytest.raises(ValueError):
+        QuantizedVectorStore(DeterministicFakeEmbedding(size=DIM), quantization="fp16")
+
+
+# --------------------------------------------------------------
+# Search
+# --------------------------------------------------------------
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_search_recall_matches_exact_search(quantization):
+    vectors = _vectors(2000)
+    store = _store(quantization, vectors)
+    normalised = _normalise(vectors)
+    queries = _normalise(_vectors(20, seed=1))
+
+    hits = 0
+    for query in queries:
+        expected = set(np.argsort(-(normalised @ query))[:10])
+        found = {doc.metadata["row"] for doc, _ in store.similarity_search_by_vector_with_score(query, k=10)}
+        hits += len(expected & found)
+
+    assert hits / (10 * len(queries)) >= 0.9
+
+
+@pytest.mark.parametrize("quantization", ["int8", "pq"])
+def test_stored_vector_is_its_own_nearest_neighbour(quantization):
+    vectors = _vectors(1000)
+    store = _store(quantization, vectors)
+
+    doc, score = store.similarity_search_by_vector_with_score(vectors[123], k=1)[0]
+
+    assert doc.metadata["row"] == 123
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_search_on_empty_store_returns_nothing():
+    store = QuantizedVectorStore(DeterministicFakeEmbedding(size=DIM))
+    assert store.similarity_search_by_vector(np.ones(DIM), k=3) == []
+
+
+def test_results_are_copies_of_stored_documents():
+    vectors = _vectors(300)
+    store = _store("int8", vectors)
+
+    doc = store.similarity_search_by_vector(vectors[0], k=1)[0]
+    doc.metadata["rerank_score"] = 1.0
+
+    again = store.similarity_search_by_vector(vectors[0], k=1)[0]
+    assert "rerank_score" not in again.metadata
+
+
+def test_save_and_load_return_the_same_results(tmp_path):
+    vectors = _vectors(500)
+    store = _store("pq", vectors)
+    store.save(str(tmp_path))
+
+    loaded = QuantizedVectorStore.load(str(tmp_path), DeterministicFakeEmbedding(size=DIM))
+
+    for query in vectors[:5]:
+        before = store.similarity_search_by_vector_with_score(query, k=5)
+        after = loaded.similarity_search_by_vector_with_score(query, k=5)
+        assert [d.id for d, _ in before] == [d.id for d, _ in after]
+        assert np.allclose([s for _, s in before], [s for _, s in after])
+
+
+def test_concurrent_appends_keep_documents_and_vectors_aligned():
+    vectors = _vectors(800)
+    store = QuantizedVectorStore(DeterministicFakeEmbedding(size=DIM))
+
+    def add(start: int) -> None:
+        for i in range(start, start + 200, 20):
+            store.add_embeddings(
+                [f"doc-{j}" for j in range(i, i + 20)],
+                vectors[i : i + 20],
+                metadatas=[{"row": j} for j in range(i, i + 20)],
+            )
+
+    threads = [threading.Thread(target=add, args=(s,)) for s in range(0, 800, 200)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for row in (0, 199, 200, 555, 799):
+        assert store.similarity_search_by_vector(vectors[row], k=1)[0].metadata["row"] == row
+
+
+def test_loaded_store_can_be_saved_back_to_its_own_folder(tmp_path):
+    vectors = _vectors(500)
+    _store("int8", vectors).save(str(tmp_path / "idx"))
+
+    # Unchanged: nothing is rewritten under the memory-mapped vectors
+    loaded = QuantizedVectorStore.load(str(tmp_path / "idx"), DeterministicFakeEmbedding(size=DIM))
+    loaded.save(str(tmp_path / "idx"))
+
+    # Changed: the directory is replaced while its vectors are still mapped
+    loaded.add_embeddings(["extra"], _vectors(1, seed=2), metadatas=[{"row": 500}])
+    loaded.save(str(tmp_path / "idx"))
+
+    reloaded = QuantizedVectorStore.load(str(tmp_path / "idx"), DeterministicFakeEmbedding(size=DIM))
+    assert reloaded.similarity_search_by_vector(vectors[42], k=1)[0].metadata["row"] == 42
+    assert len(reloaded._docs) == 501
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["idx"]
@@ -0,0 +1,80 @@
+"""
+Unit tests for cross-encoder re-ranking, with a stub model in place of
+sentence-transformers.
+"""
+
+import numpy as np
+from langchain_core.documents import Document
+
+from flipkart.reranker import CrossEncoderReranker
+
+
+class StubCrossEncoder:
+    """Scores a review by the number in its text; records each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.batches.append((list(pairs), batch_size))
+        return np.array([float(text.split()[-1]) for _, text in pairs], dtype=np.float32)
+
+
+def _reranker(top_n: int) -> CrossEncoderReranker:
+    # Bypass __init__, which loads the real model
+    reranker = CrossEncoderReranker.__new__(CrossEncoderReranker)
+    reranker.model_name = "stub"
+    reranker.top_n = top_n
+    reranker.model = StubCrossEncoder()
+    return reranker
+
+
+def _docs(scores: list) -> list:
+    return [
+        Document(page_content=f"review {score}", metadata={"product_name": f"p{i}"}, id=str(i))
+        for i, score in enumerate(scores)
+    ]
+
+
+def test_documents_are_ordered_by_score_and_truncated():
+    reranker = _reranker(top_n=2)
+
+    ranked = reranker.rerank("query", _docs([0.1, 0.9, -2.0, 0.5]))
+
+    assert [d.id for d in ranked] == ["1", "3"]
+    assert [d.metadata["rerank_score"] for d in ranked] == [np.float32(0.9), np.float32(0.5)]
+    assert all(type(d.metadata["rerank_score"]) is float for d in ranked)
+
+
+def test_all_candidates_are_scored_in_one_batch():
+    reranker = _reranker(top_n=2)
+
+    reranker.rerank("query", _docs([1, 2, 3]))
+
+    [(pairs, batch_size)] = reranker.model.batches
+    assert batch_size == 3
+    assert pairs == [("query", "review 1"), ("query", "review 2"), ("query", "review 3")]
+
+
+def test_fewer_candidates_than_top_n_are_all_returned():
+    ranked = _reranker(top_n=5).rerank("query", _docs([0.2, 0.7]))
+
+    assert [d.id for d in ranked] == ["1", "0"]
+
+
+def test_inputs_are_not_modified():
+    docs = _docs([0.3, 0.8])
+
+    ranked = _reranker(top_n=2).rerank("query", docs)
+
+    assert all("rerank_score" not in d.metadata for d in docs)
+    assert all(r is not d for r in ranked for d in docs)
+    assert ranked[0].metadata == {"product_name": "p1", "rerank_score": np.float32(0.8)}
+    assert ranked[0].page_content == docs[1].page_content
+
+
+def test_empty_input_skips_the_model():
+    reranker = _reranker(top_n=3)
+
+    assert reranker.rerank("query", []) == []
+    assert reranker.model.batches == []
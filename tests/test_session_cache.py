@@ -0,0 +1,35 @@
+"""
+Unit tests for the bounded per-session state cache.
+"""
+
+import time
+
+from flipkart.session_cache import SessionCache
+
+
+def test_least_recently_used_session_is_evicted():
+    cache = SessionCache(max_entries=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # touch "a" so "b" becomes the oldest
+
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert sorted(cache) == ["a", "c"]
+
+
+def test_idle_sessions_expire():
+    cache = SessionCache(max_entries=10, ttl=0.05)
+    cache["a"] = 1
+    time.sleep(0.1)
+    cache["b"] = 2
+
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_missing_session_behaves_like_a_dict():
+    cache = SessionCache(max_entries=10, ttl=60)
+    assert cache.get("missing", ("", 0)) == ("", 0)
+    assert cache.pop("missing", None) is None
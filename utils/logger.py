@@ -2,29 +2,38 @@
 logger.py
 ----------
 Centralised logging configuration module for the
-MLOps Titanic Survival Prediction project.
+LLMOps Flipkart Product Recommender project.
 
 This script sets up a standardised logging system that writes logs
 to a dedicated `logs/` directory and prints messages to the console.
-Each log file is automatically named by date (`log_YYYY-MM-DD.log`)
-and encoded in UTF-8 to support special characters and emojis.
+Two modes are available, selected with the `LOG_ASYNC` environment variable:
 
-It provides a simple helper function, `get_logger(name)`, that returns
-a configured logger instance for use across all modules.
+- Synchronous (default): plain-text records written by a `FileHandler` and a
+  stdout handler on the calling thread. Log files are named by the date on
+  which each record is written (`log_YYYY-MM-DD.log`).
+- Asynchronous (`LOG_ASYNC=true`): records are pushed onto an in-memory queue
+  by a `QueueHandler` and written as JSON lines by a background
+  `QueueListener`, so the request thread never blocks on I/O. The file
+  (`logs/app.jsonl`) rotates at midnight or by size (`LOG_ROTATE=time|size`).
+
+Every record carries the current request and session IDs, bound per request
+with `request_context()`. Per-stage timings recorded with `timed()` are
+collected on the active request context.
 
 Usage
 -----
 Example:
-    from src.logger import get_logger
+    from utils.logger import get_logger, request_context, timed
 
     logger = get_logger(__name__)
-    logger.info("🚀 Model training started.")
-    logger.error("❌ Failed to connect to database.")
+    with request_context(request_id="abc", session_id="s1") as durations:
+        with timed("retrieve"):
+            ...
+        logger.info("Request served", extra={"durations_ms": durations})
 
 Notes
 -----
-- Logs are written to `logs/log_YYYY-MM-DD.log` (UTF-8 encoded)
-- Each message includes a timestamp and severity level.
+- Each message includes a timestamp, severity level, request and session IDs.
 - Default level: INFO
 - Console and file outputs both support Unicode characters.
 """
@@ -32,9 +41,17 @@ Notes
 # -------------------------------------------------------------------
 # Standard Library Imports
 # -------------------------------------------------------------------
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 
 # -------------------------------------------------------------------
@@ -43,10 +60,235 @@ from datetime import datetime
 LOGS_DIR = "logs"
 os.makedirs(LOGS_DIR, exist_ok=True)
 
+# -------------------------------------------------------------------
+# Mode Configuration
+# -------------------------------------------------------------------
+LOG_ASYNC = os.getenv("LOG_ASYNC", "false").lower() == "true"
+LOG_ROTATE = os.getenv("LOG_ROTATE", "time")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+
+# Raw user questions are only written to the logs when explicitly enabled
+LOG_QUERY_TEXT = os.getenv("LOG_QUERY_TEXT", "false").lower() == "true"
+
 # -------------------------------------------------------------------
 # Log File Configuration
 # -------------------------------------------------------------------
-LOG_FILE = os.path.join(LOGS_DIR, f"log_{datetime.now().strftime('%Y-%m-%d')}.log")
+JSON_LOG_FILE = os.path.join(LOGS_DIR, "app.jsonl")
+
+# -------------------------------------------------------------------
+# Request Context
+# -------------------------------------------------------------------
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+_session_id: ContextVar[str] = ContextVar("session_id", default="-")
+_durations: ContextVar[dict | None] = ContextVar("durations", default=None)
+
+# Attributes present on every LogRecord; anything else came from `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "session_id",
+}
+
+
+@contextmanager
+def request_context(request_id: str, session_id: str):
+    """
+    Bind request and session IDs to all records logged inside the block.
+
+    Parameters
+    ----------
+    request_id : str
+        Correlation ID of the current request.
+    session_id : str
+        ID of the chat session the request belongs to.
+
+    Yields
+    ------
+    dict[str, float]
+        Mapping of stage name to duration in milliseconds, filled by `timed()`.
+    """
+    durations: dict[str, float] = {}
+    tokens = (
+        _request_id.set(request_id),
+        _session_id.set(session_id),
+        _durations.set(durations),
+    )
+    try:
+        yield durations
+    finally:
+        _durations.reset(tokens[2])
+        _session_id.reset(tokens[1])
+        _request_id.reset(tokens[0])
+
+
+@contextmanager
+def timed(stage: str):
+    """
+    Record the wall-clock duration of a block on the active request context.
+
+    Parameters
+    ----------
+    stage : str
+        Stage name used as the key in the request's durations mapping.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_duration(stage, time.perf_counter() - start)
+
+
+def record_duration(stage: str, seconds: float) -> None:
+    """
+    Store a stage duration measured elsewhere on the active request context.
+
+    Parameters
+    ----------
+    stage : str
+        Stage name used as the key in the request's durations mapping.
+    seconds : float
+        Measured duration in seconds.
+    """
+    durations = _durations.get()
+    if durations is not None:
+        durations[stage] = round(seconds * 1000, 3)
+
+
+class _ContextFilter(logging.Filter):
+    """Attach the current request and session IDs to each record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.session_id = _session_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "session_id": getattr(record, "session_id", "-"),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Traceback rendered by `_JsonQueueHandler.prepare` on the caller's thread
+            payload["exc_info"] = record.exc_text
+        if record.stack_info:
+            payload["stack_info"] = record.stack_info
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _JsonQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that keeps tracebacks out of the message.
+
+    The base `prepare` formats the traceback into `message` and clears
+    `exc_info`. This one renders it into `exc_text` instead, so that
+    `JsonFormatter` writes it as its own `exc_info` field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Copy so other handlers of the same record are unaffected
+        record = copy.copy(record)
+        record.message = record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames; keep only their text for the listener thread
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# Renders tracebacks in `_JsonQueueHandler.prepare`
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class _DailyFileHandler(logging.FileHandler):
+    """File handler that switches to `log_YYYY-MM-DD.log` when the date changes."""
+
+    def __init__(self):
+        self._date = datetime.now().strftime("%Y-%m-%d")
+        super().__init__(self._path(), encoding="utf-8", delay=True)
+
+    def _path(self) -> str:
+        return os.path.join(LOGS_DIR, f"log_{self._date}.log")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        today = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d")
+        if today != self._date:
+            self._date = today
+            self.close()
+            self.baseFilename = os.path.abspath(self._path())
+        super().emit(record)
+
+
+def _console_handler() -> logging.StreamHandler:
+    """Create a stdout handler with UTF-8 encoding."""
+    console_handler = logging.StreamHandler(sys.stdout)
+
+    # Ensure stdout stream is UTF-8 encoded (Python 3.9+)
+    if hasattr(console_handler.stream, "reconfigure"):
+        console_handler.stream.reconfigure(encoding="utf-8")
+    return console_handler
+
+
+# -------------------------------------------------------------------
+# Shared Asynchronous Pipeline
+# -------------------------------------------------------------------
+_queue_handler: logging.handlers.QueueHandler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _get_queue_handler() -> logging.handlers.QueueHandler:
+    """
+    Return the process-wide QueueHandler, starting its listener on first use.
+
+    The listener thread owns the file and console handlers; request threads
+    only pay for an unbounded `queue.SimpleQueue.put`.
+    """
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        return _queue_handler
+
+    if LOG_ROTATE == "size":
+        file_handler = logging.handlers.RotatingFileHandler(
+            JSON_LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    else:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            JSON_LOG_FILE, when="midnight", backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    console_handler = _console_handler()
+
+    formatter = JsonFormatter()
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _queue_handler = _JsonQueueHandler(log_queue)
+    _queue_handler.addFilter(_ContextFilter())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    # Drain queued records on interpreter shutdown
+    atexit.register(_listener.stop)
+    return _queue_handler
+
 
 # -------------------------------------------------------------------
 # Logger Factory Function
@@ -71,26 +313,31 @@ def get_logger(name: str) -> logging.Logger:
 
     # Prevent adding duplicate handlers if re-imported
     if not logger.handlers:
+        if LOG_ASYNC:
+            # -------------------------------------------------------------------
+            # Queue Handler (JSON lines, written by a background listener)
+            # -------------------------------------------------------------------
+            logger.addHandler(_get_queue_handler())
+            return logger
+
         # -------------------------------------------------------------------
-        # File Handler (UTF-8)
+        # File Handler (UTF-8, one file per day)
         # -------------------------------------------------------------------
-        file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+        file_handler = _DailyFileHandler()
         file_handler.setLevel(logging.INFO)
 
         # -------------------------------------------------------------------
         # Console Handler (UTF-8)
         # -------------------------------------------------------------------
-        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler = _console_handler()
         console_handler.setLevel(logging.INFO)
 
-        # Ensure stdout stream is UTF-8 encoded (Python 3.9+)
-        if hasattr(console_handler.stream, "reconfigure"):
-            console_handler.stream.reconfigure(encoding="utf-8")
-
         # -------------------------------------------------------------------
         # Formatter
         # -------------------------------------------------------------------
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        formatter = logging.Formatter(
+            "%(asctime)s - %(levelname)s - [%(request_id)s %(session_id)s] - %(message)s"
+        )
 
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
@@ -98,7 +345,11 @@ def get_logger(name: str) -> logging.Logger:
         # -------------------------------------------------------------------
         # Attach Handlers
         # -------------------------------------------------------------------
+        context_filter = _ContextFilter()
+        file_handler.addFilter(context_filter)
+        console_handler.addFilter(context_filter)
+
         logger.addHandler(file_handler)
         logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+    return logger
@@ -0,0 +1,297 @@
+"""
+profiling.py
+------------
+Opt-in profiling utilities for the LLMOps Flipkart Product Recommender.
+
+This module provides complementary tools:
+
+- `StageProfiler` — a LangChain callback handler that times named runnables
+  of the RAG chain (by run name). It records each duration on the active
+  request (see `utils.logger.timed`) and in the `rag_stage_duration_seconds`
+  Prometheus histogram. The runnables themselves are never wrapped, so they
+  keep their native `stream`/`batch`/`ainvoke`; the handler is attached only
+  when profiling is enabled (`PROFILING_ENABLED=true`).
+- `stage(name)` — a context manager for stages that are plain Python code
+  rather than runnables. It always records the request duration and also
+  feeds the histogram when profiling is enabled.
+- `SamplingProfiler` — a pure-Python wall-clock sampling profiler that walks
+  every thread's stack at a fixed interval for a bounded time and exports the
+  result as collapsed stacks (flame-graph input) or a speedscope JSON file.
+
+Usage
+-----
+Example:
+    from utils.profiling import PROFILING_ENABLED, SamplingProfiler, StageProfiler, stage
+
+    if PROFILING_ENABLED:
+        chain = chain.with_config(callbacks=[StageProfiler({"qa_llm", "qa_parse"})])
+
+    with stage("rerank"):
+        ...
+
+    profile = SamplingProfiler(interval=0.005).run(seconds=10)
+    open("profile.speedscope.json", "w").write(profile.to_speedscope())
+
+Notes
+-----
+- Stage profiling is controlled by `PROFILING_ENABLED=true` at start-up.
+- Sampling sees all threads, including those blocked on network I/O, so
+  the output shows where wall-clock time goes, not just CPU time.
+- Only one sampling session can run at a time per process.
+"""
+
+# -------------------------------------------------------------------
+# Standard Library Imports
+# -------------------------------------------------------------------
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Tuple
+from uuid import UUID
+
+# -------------------------------------------------------------------
+# Third-Party Imports
+# -------------------------------------------------------------------
+from langchain_core.callbacks import BaseCallbackHandler
+from prometheus_client import Histogram
+
+# -------------------------------------------------------------------
+# Local Imports
+# -------------------------------------------------------------------
+from utils.logger import record_duration, timed
+
+# -------------------------------------------------------------------
+# Configuration
+# -------------------------------------------------------------------
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+
+# Per-stage latency of the RAG chain (populated only when profiling is enabled)
+STAGE_LATENCY = Histogram(
+    "rag_stage_duration_seconds",
+    "Duration of individual RAG chain stages",
+    ["stage"],
+)
+
+
+# -------------------------------------------------------------------
+# Stage Timing
+# -------------------------------------------------------------------
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Time a block of plain Python code as a named chain stage.
+
+    Parameters
+    ----------
+    name : str
+        Stage name used in request durations and the Prometheus label.
+    """
+    start = time.perf_counter()
+    try:
+        with timed(name):
+            yield
+    finally:
+        if PROFILING_ENABLED:
+            STAGE_LATENCY.labels(stage=name).observe(time.perf_counter() - start)
+
+
+class StageProfiler(BaseCallbackHandler):
+    """
+    Callback handler timing chain runnables whose run name is a known stage.
+
+    Start times are keyed by run ID, so one handler can be shared by
+    concurrent requests.
+
+    Parameters
+    ----------
+    stages : Iterable[str]
+        Run names to time (set with `RunnableLambda(name=...)` or
+        `runnable.with_config(run_name=...)`).
+    """
+
+    def __init__(self, stages: Iterable[str]):
+        self.stages = frozenset(stages)
+        self._starts: Dict[UUID, Tuple[str, float]] = {}
+
+    def _start(self, run_id: UUID, name: str | None) -> None:
+        if name in self.stages:
+            self._starts[run_id] = (name, time.perf_counter())
+
+    def _end(self, run_id: UUID) -> None:
+        started = self._starts.pop(run_id, None)
+        if started is None:
+            return
+        name, start = started
+        seconds = time.perf_counter() - start
+        STAGE_LATENCY.labels(stage=name).observe(seconds)
+        record_duration(name, seconds)
+
+    def on_chain_start(self, serialized: Any, inputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, kwargs.get("name"))
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, kwargs.get("name"))
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start(run_id, kwargs.get("name"))
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._end(run_id)
+
+
+# -------------------------------------------------------------------
+# Sampling Profiler
+# -------------------------------------------------------------------
+class ProfilerBusyError(RuntimeError):
+    """Raised when a sampling session is already running."""
+
+
+class SamplingProfile:
+    """
+    Aggregated stack samples captured by `SamplingProfiler`.
+
+    Attributes
+    ----------
+    samples : Counter[tuple[str, ...]]
+        Count of each observed stack (root first, thread name at the root).
+    interval : float
+        Sampling interval in seconds.
+    duration : float
+        Wall-clock duration of the session in seconds.
+    """
+
+    def __init__(self, samples: Counter, interval: float, duration: float):
+        self.samples = samples
+        self.interval = interval
+        self.duration = duration
+
+    def to_collapsed(self) -> str:
+        """Return Brendan Gregg's collapsed-stack format (`a;b;c count`)."""
+        lines = [f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common()]
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self) -> str:
+        """Return a speedscope file (https://www.speedscope.app) as JSON."""
+        frame_index: dict[str, int] = {}
+        frames: list[dict] = []
+        profiles: dict[str, dict] = {}
+
+        for stack, count in self.samples.items():
+            thread, *calls = stack
+            indices = []
+            for call in calls:
+                if call not in frame_index:
+                    frame_index[call] = len(frames)
+                    frames.append({"name": call})
+                indices.append(frame_index[call])
+
+            profile = profiles.setdefault(
+                thread,
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            profile["samples"].append(indices)
+            profile["weights"].append(count * self.interval)
+
+        document = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+            "name": "flipkart-recommender",
+            "exporter": "utils.profiling",
+        }
+        return json.dumps(document)
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for all threads of the running process.
+
+    Parameters
+    ----------
+    interval : float, default=0.005
+        Seconds between stack samples.
+
+    Methods
+    -------
+    run(seconds: float) -> SamplingProfile
+        Sample for `seconds` and return the aggregated profile.
+    """
+
+    # Guards against concurrent sessions within the process
+    _lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+
+    def run(self, seconds: float) -> SamplingProfile:
+        """
+        Sample every thread's stack for a bounded time.
+
+        Parameters
+        ----------
+        seconds : float
+            Duration of the sampling session.
+
+        Returns
+        -------
+        SamplingProfile
+            Aggregated stack counts.
+
+        Raises
+        ------
+        ProfilerBusyError
+            If another sampling session is in progress.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running")
+
+        try:
+            samples: Counter = Counter()
+            own_id = threading.get_ident()
+            start = time.perf_counter()
+            deadline = start + seconds
+
+            while time.perf_counter() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    samples[_stack(names.get(thread_id, str(thread_id)), frame)] += 1
+                time.sleep(self.interval)
+
+            return SamplingProfile(samples, self.interval, time.perf_counter() - start)
+        finally:
+            self._lock.release()
+
+
+def _stack(thread_name: str, frame) -> tuple[str, ...]:
+    """Return a root-first stack of `function (file:first_line)` labels."""
+    calls = []
+    while frame is not None:
+        code = frame.f_code
+        calls.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return (thread_name, *reversed(calls))